@@ -13,19 +13,77 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # SQLite engine profile (pool sizing here, per-connection pragmas once engines exist)
+    from application.sqlite_profile import configure_engine_options, apply_sqlite_profile
+    configure_engine_options(app)
+
+    # Optional read replica bind (must be registered before the engines are created)
+    from application.db_routing import configure_replica, init_replica
+    configure_replica(app)
+
     # Initialize extensions with app context
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_profile(app, engine)
     migrate.init_app(app, db)
     login_manager.init_app(app)
 
     login_manager.login_view = "auth.user_login"
     login_manager.login_message_category = "warning"
 
+    # Read-your-writes tracking and local replica sync for routed reads
+    init_replica(app)
+
+    # In-process cache of lightweight user identities for the user loader
+    from application.user_cache import init_user_cache
+    init_user_cache(app)
+
+    # Batched write-behind of User.last_seen
+    from application.last_seen import init_last_seen
+    init_last_seen(app)
+
+    # Group-commit pipeline for quiz submissions
+    from application.submissions import init_submissions
+    init_submissions(app)
+
+    # Quiz snapshots and single-flight coalescing of concurrent content loads
+    from application.quiz_content import init_quiz_content
+    init_quiz_content(app)
+
+    # Versioned snapshot of the Subject -> Chapter -> Quiz tree
+    from application.content_tree import init_content_tree
+    init_content_tree(app)
+
+    # Compiled answer keys used for grading
+    from application.answer_keys import init_answer_keys
+    init_answer_keys(app)
+
+    # Cached psychometric item analysis
+    from application.item_analysis import init_item_analysis
+    init_item_analysis(app)
+
+    # Rendered question bodies for the quiz attempt page
+    from application.fragments import init_fragment_cache
+    init_fragment_cache(app)
+
+    # In-memory per-quiz leaderboards
+    from application.leaderboard import init_leaderboards
+    init_leaderboards(app)
+
+    # Background warming of quizzes shortly before they open
+    from application.warming import init_warming
+    init_warming(app)
+
     app.jinja_env.filters['get_attribute'] = get_attribute
 
     # Register blueprints
     register_blueprints(app)
 
+    # Register maintenance CLI commands
+    from application.commands import register_commands
+    register_commands(app)
+
     @app.cli.command("init-db")
     def init_db():
         # Initialize the database and create default admin.
@@ -33,6 +91,10 @@ def create_app(config_class=Config):
 
         db.create_all()
 
+        # Create the full-text search index (SQLite only)
+        from application.search import reindex
+        reindex()
+
         # Check if admin user exists
         admin_user = User.query.filter_by(is_admin=True).first()
         if not admin_user:
@@ -75,5 +137,5 @@ def register_blueprints(app):
 
 @login_manager.user_loader
 def load_user(user_id):
-    from application.models import User
-    return User.query.get(int(user_id))
+    from application.user_cache import load_cached_user
+    return load_cached_user(int(user_id))
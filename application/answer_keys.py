@@ -0,0 +1,97 @@
+# Compiled per-quiz answer keys.
+# A key is a compact array of question ids plus the matching correct options, cached per
+# (quiz id, content_version) so grading a submission never loads Question rows.
+from array import array
+import numpy as np
+from flask import current_app
+from application.caching import LRUCache
+from application.models import AnswerLayout, Question, Score
+from application.answer_sheets import is_packed, split_packed, unpack_matrix
+from application.quiz_content import single_flight
+
+class AnswerKey:
+    __slots__ = ('quiz_id', 'version', 'question_ids', 'correct_options', 'fields')
+
+    def __init__(self, quiz_id, version, rows):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.question_ids = array('l', (question_id for question_id, _ in rows))
+        self.correct_options = bytes(correct for _, correct in rows)
+        self.fields = tuple(f"question_{question_id}" for question_id in self.question_ids)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def items(self):
+        """(question_id, correct_option) pairs in question order."""
+        return zip(self.question_ids, self.correct_options)
+
+    def correct_array(self):
+        return np.frombuffer(self.correct_options, dtype=np.uint8).astype(np.int8)
+
+    def grade(self, form):
+        """Single pass over the submitted form: returns (score, {question_id: chosen option})."""
+        total = 0
+        answers = {}
+        for question_id, correct, field in zip(self.question_ids, self.correct_options, self.fields):
+            raw = form.get(field)
+            if not raw:
+                continue
+            try:
+                choice = int(raw)
+            except ValueError:
+                continue
+            answers[question_id] = choice
+            if choice == correct:
+                total += 1
+        return total, answers
+
+def answer_matrix(raw_answers, key, count):
+    """Decode `count` stored answer values into an int8 (attempts x questions) matrix; 0 = unanswered."""
+    columns = {question_id: i for i, question_id in enumerate(key.question_ids)}
+    matrix = np.zeros((count, len(columns)), dtype=np.int8)
+    packed = {}  # layout id -> ([row], [code bytes]), decoded together below
+    for i, raw in enumerate(raw_answers):
+        if is_packed(raw):
+            layout_id, payload = split_packed(bytes(raw))
+            rows, payloads = packed.setdefault(layout_id, ([], []))
+            rows.append(i)
+            payloads.append(payload)
+            continue
+        for question_id, option in Score.decode_answers(raw).items():
+            column = columns.get(question_id)
+            if column is not None and isinstance(option, int) and 0 < option < 128:
+                matrix[i, column] = option
+
+    for layout_id, (rows, payloads) in packed.items():
+        order = AnswerLayout.order_for(layout_id)
+        # Layout positions that are still on the key, and the key column each lands in
+        positions = [p for p, question_id in enumerate(order) if question_id in columns]
+        if not positions:
+            continue
+        targets = [columns[order[p]] for p in positions]
+        options = unpack_matrix(payloads, len(order))
+        matrix[np.ix_(rows, targets)] = options[:, positions]
+    return matrix
+
+def init_answer_keys(app):
+    app.extensions['answer_keys'] = LRUCache(maxsize=app.config.get('ANSWER_KEY_CACHE_SIZE', 512))
+
+def compile_answer_key(quiz_id, version):
+    rows = Question.for_quiz(quiz_id).with_entities(Question.id, Question.correct_option).all()
+    return AnswerKey(quiz_id, version, rows)
+
+def get_answer_key(quiz):
+    """Cached answer key for the quiz's current content_version."""
+    cache = current_app.extensions['answer_keys']
+    key = cache.get(quiz.id)
+    if key is None or key.version != quiz.content_version:
+        key = single_flight(('answer_key', quiz.id, quiz.content_version),
+                            lambda: compile_answer_key(quiz.id, quiz.content_version))
+        cache.set(quiz.id, key)
+    return key
+
+def invalidate_answer_key(quiz_id):
+    cache = current_app.extensions.get('answer_keys')
+    if cache is not None:
+        cache.pop(quiz_id)
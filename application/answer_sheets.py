@@ -0,0 +1,84 @@
+# Compact binary encoding for stored answer sheets.
+# A packed sheet is a version byte, the varint id of an AnswerLayout (the quiz's question ids in
+# order at submission time) and one 3-bit code per layout position: 0 = unanswered, 1-7 = the
+# chosen option. A 20-question attempt takes ~10 bytes instead of ~150 bytes of JSON.
+# Sheets that cannot be packed (unknown question ids, out-of-range options) and rows written
+# before the packed format are stored as JSON, which is always accepted on read.
+import json
+import numpy as np
+
+FORMAT_PACKED = 1
+BITS_PER_ANSWER = 3
+MAX_OPTION = (1 << BITS_PER_ANSWER) - 1
+_MASK = MAX_OPTION
+
+def _write_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def pack_answers(answers, layout_id, question_ids):
+    """Encode {question_id: option} against a layout; returns None when the sheet does not fit it."""
+    positions = {question_id: i for i, question_id in enumerate(question_ids)}
+    codes = 0
+    for question_id, option in answers.items():
+        position = positions.get(int(question_id))
+        if position is None or not isinstance(option, int) or not 0 < option <= MAX_OPTION:
+            return None
+        codes |= option << (position * BITS_PER_ANSWER)
+    out = bytearray((FORMAT_PACKED,))
+    _write_varint(layout_id, out)
+    out += codes.to_bytes((len(question_ids) * BITS_PER_ANSWER + 7) // 8, 'little')
+    return bytes(out)
+
+def dump_json(answers):
+    return json.dumps({str(k): v for k, v in answers.items()}).encode()
+
+def is_packed(raw):
+    return bool(raw) and not isinstance(raw, str) and raw[0] == FORMAT_PACKED
+
+def split_packed(raw):
+    """(layout id, code bytes) of a packed sheet."""
+    layout_id, pos = _read_varint(raw, 1)
+    return layout_id, raw[pos:]
+
+def unpack_codes(raw):
+    """(layout id, int holding the 3-bit codes) of a packed sheet."""
+    layout_id, payload = split_packed(raw)
+    return layout_id, int.from_bytes(payload, 'little')
+
+def unpack_matrix(payloads, count):
+    """Decode code bytes of sheets sharing one layout into an (n, count) uint8 matrix of options."""
+    width = (count * BITS_PER_ANSWER + 7) // 8
+    data = np.frombuffer(b''.join(payload.ljust(width, b'\0')[:width] for payload in payloads), dtype=np.uint8)
+    bits = np.unpackbits(data.reshape(len(payloads), width), axis=1, bitorder='little')
+    bits = bits[:, :count * BITS_PER_ANSWER].reshape(len(payloads), count, BITS_PER_ANSWER)
+    return bits @ (1 << np.arange(BITS_PER_ANSWER, dtype=np.uint8))
+
+def iter_codes(codes, count):
+    """(position, option) for every answered position."""
+    position = 0
+    while codes and position < count:
+        option = codes & _MASK
+        if option:
+            yield position, option
+        codes >>= BITS_PER_ANSWER
+        position += 1
+
+def load_json(raw):
+    """Decode a legacy JSON sheet (str or bytes) into {question_id: option}."""
+    try:
+        return {int(k): v for k, v in json.loads(raw).items()}
+    except (ValueError, TypeError, AttributeError):
+        return {}
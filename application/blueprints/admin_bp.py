@@ -1,8 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash 
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, current_app
+import io
 from application import db
-from application.models import Subject, Chapter, Quiz, Question, User, Score
+from application.models import Subject, Chapter, Quiz, Question, User, Score, QuizStats, QuestionStats, ScoreHistogram
 from application.forms import SubjectForm, ChapterForm, QuizForm, QuestionForm
 from application.decorators import admin_required
+from application.answer_keys import invalidate_answer_key
+from application.fragments import invalidate_quiz_fragments
+from application.content_tree import get_content_tree
+from application.read_models import attempts_query, question_rows, user_rows
+from application.question_import import detect_format, import_questions as run_question_import
+from application.regrade import regrade_quiz as run_regrade
+from application.db_routing import replica_reads
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -11,20 +19,23 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 # -------------------------------------------
 @admin_bp.route('/dashboard')
 @admin_required
+@replica_reads
 def dashboard():
     # Display a dashboard
+    tree_counts = get_content_tree().counts
     stats = {
         'users': User.query.count(),
-        'subjects': Subject.query.count(),
-        'quizzes': Quiz.query.count(),
+        'subjects': tree_counts['subjects'],
+        'quizzes': tree_counts['quizzes'],
         'questions': Question.query.count()}
     return render_template('admin/dashboard.html', stats=stats)
 
 @admin_bp.route('/users')
 @admin_required
+@replica_reads
 def manage_users():
-    # Display all users in the system  
-    users = User.query.order_by(User.username).all()
+    # Display all users in the system (column-projected rows, bio deferred)
+    users = user_rows()
     return render_template('admin/manage_users.html', users=users)
 
 @admin_bp.route('/users/<int:user_id>/delete', methods=['POST'])
@@ -32,7 +43,14 @@ def manage_users():
 def delete_user(user_id):
     # Delete a user
     user = User.query.get_or_404(user_id)
+    # Quizzes this user attempted need their rollups recomputed without the user's scores
+    quiz_ids = [quiz_id for (quiz_id,) in db.session.query(Score.quiz_id).filter_by(user_id=user.id).distinct()]
     db.session.delete(user)
+    db.session.flush()
+    if quiz_ids:
+        QuizStats.rebuild(quiz_ids)
+        ScoreHistogram.rebuild(quiz_ids)
+        QuestionStats.rebuild(quiz_ids)
     db.session.commit()
     flash('User deleted successfully', 'success')
     return redirect(url_for('admin.manage_users'))
@@ -69,8 +87,8 @@ def manage_subjects():
 
         return redirect(url_for('admin.manage_subjects'))
 
-    # GET request => show all subjects
-    subjects = Subject.query.order_by(Subject.name).all()
+    # GET request => show all subjects (from the hierarchy snapshot)
+    subjects = sorted(get_content_tree().subjects, key=lambda subject: subject.name)
     return render_template('admin/manage_subjects.html', form=form, subjects=subjects)
 
 
@@ -94,7 +112,9 @@ def delete_subject(subject_id):
 
 @admin_bp.route('/admin/chapters/<int:subject_id>', methods=['GET', 'POST'])
 def manage_chapters(subject_id):
-    subject = Subject.query.get_or_404(subject_id)
+    subject = get_content_tree().subject(subject_id)
+    if subject is None:
+        abort(404)
     form = ChapterForm(request.form) # Initialize the form
 
     # Provide the choice
@@ -127,11 +147,10 @@ def manage_chapters(subject_id):
 
             return redirect(url_for('admin.manage_chapters', subject_id=subject_id))
 
-    chapters = Chapter.query.filter_by(subject_id=subject_id).all()
     return render_template(
         'admin/manage_chapters.html',
         subject=subject,
-        chapters=chapters,
+        chapters=subject.chapters,
         form=form)
 
 
@@ -155,11 +174,12 @@ def delete_chapter(chapter_id):
 @admin_bp.route('/quizzes/<int:chapter_id>', methods=['GET'])
 @admin_required
 def manage_quizzes(chapter_id):
-    chapter = Chapter.query.get_or_404(chapter_id)
-    quizzes = Quiz.query.filter_by(chapter_id=chapter.id).all()
+    chapter = get_content_tree().chapter(chapter_id)
+    if chapter is None:
+        abort(404)
     return render_template('admin/manage_quizzes.html',
                            chapter=chapter,
-                           quizzes=quizzes)
+                           quizzes=chapter.quizzes)
 
 @admin_bp.route('/chapters/<int:chapter_id>/quizzes/new', methods=['GET', 'POST'])
 @admin_required
@@ -222,6 +242,7 @@ def edit_quiz(chapter_id, quiz_id):
         quiz.remarks = form.remarks.data
         
         db.session.commit()
+        invalidate_quiz_fragments(quiz.id)
         flash("Quiz updated successfully!", "success")
         return redirect(url_for('admin.manage_quizzes', chapter_id=chapter.id))
 
@@ -241,6 +262,8 @@ def delete_quiz(quiz_id):
     try:
         db.session.delete(quiz)
         db.session.commit()
+        invalidate_answer_key(quiz_id)
+        invalidate_quiz_fragments(quiz_id)
         flash('Quiz deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -255,7 +278,7 @@ def delete_quiz(quiz_id):
 def manage_questions(quiz_id):
     # Question management create & edit route.
     form = QuestionForm()
-    quiz = Quiz.query.get_or_404(quiz_id)
+    quiz = get_content_tree().quiz(quiz_id) or Quiz.query.get_or_404(quiz_id)
 
     if request.method == "POST":
         question_id = request.form.get("question_id")
@@ -277,6 +300,8 @@ def manage_questions(quiz_id):
                 existing_q.option4 = option4
                 existing_q.correct_option = correct_option
                 db.session.commit()
+                invalidate_answer_key(quiz.id)
+                invalidate_quiz_fragments(quiz.id)
                 flash("Question updated successfully!", "success")
             else:
                 # to create new question
@@ -291,6 +316,8 @@ def manage_questions(quiz_id):
                 )
                 db.session.add(new_q)
                 db.session.commit()
+                invalidate_answer_key(quiz.id)
+                invalidate_quiz_fragments(quiz.id)
                 flash("Question added successfully!", "success")
 
         except Exception as e:
@@ -299,8 +326,8 @@ def manage_questions(quiz_id):
 
         return redirect(url_for('admin.manage_questions', quiz_id=quiz.id))
 
-    # GET request - display questions
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
+    # GET request - display questions as lightweight rows
+    questions = question_rows(quiz_id, with_text=True)
     return render_template(
         'admin/manage_questions.html',
         form=form,
@@ -308,6 +335,47 @@ def manage_questions(quiz_id):
         questions=questions)
 
 
+@admin_bp.route('/questions/<int:quiz_id>/import', methods=['POST'])
+@admin_required
+def import_questions(quiz_id):
+    # Bulk import questions from an uploaded CSV or JSONL file
+    quiz = Quiz.query.get_or_404(quiz_id)
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash("Please choose a CSV or JSONL file to import.", "warning")
+        return redirect(url_for('admin.manage_questions', quiz_id=quiz.id))
+
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        result = run_question_import(quiz, stream, detect_format(upload.filename))
+    except Exception as e:
+        flash(f"Import failed: {str(e)}", "danger")
+        return redirect(url_for('admin.manage_questions', quiz_id=quiz.id))
+
+    flash(f"Imported {result.inserted} questions.", "success")
+    if result.errors:
+        details = "; ".join(
+            f"row {row_number}: " + ", ".join(f"{field} - {' '.join(messages)}" for field, messages in errors.items())
+            for row_number, errors in result.errors[:10])
+        more = f" (and {len(result.errors) - 10} more)" if len(result.errors) > 10 else ""
+        flash(f"{len(result.errors)} rows skipped: {details}{more}", "warning")
+    return redirect(url_for('admin.manage_questions', quiz_id=quiz.id))
+
+
+@admin_bp.route('/quizzes/<int:quiz_id>/regrade', methods=['POST'])
+@admin_required
+def regrade_quiz(quiz_id):
+    # Rescore every stored attempt against the quiz's current correct options
+    quiz = Quiz.query.get_or_404(quiz_id)
+    try:
+        result = run_regrade(quiz.id)
+        flash(f"Regraded {result.attempts} attempts; {result.changed} scores changed.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Regrade failed: {str(e)}", "danger")
+    return redirect(url_for('admin.manage_questions', quiz_id=quiz.id))
+
+
 @admin_bp.route('/questions/<int:question_id>/delete', methods=['POST'])
 @admin_required
 def delete_question(question_id):
@@ -317,6 +385,8 @@ def delete_question(question_id):
     try:
         db.session.delete(question)
         db.session.commit()
+        invalidate_answer_key(quiz_id)
+        invalidate_quiz_fragments(quiz_id)
         flash('Question deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -326,23 +396,48 @@ def delete_question(question_id):
 
 @admin_bp.route('/attempts')
 @admin_required
+@replica_reads
 def view_all_attempts():
-    all_attempts = Score.query.order_by(Score.time_stamp_of_attempt.desc()).all()
-    return render_template('admin/manage_attempts.html', attempts=all_attempts)
+    # Keyset pagination on (time_stamp_of_attempt, id), newest first
+    per_page = current_app.config.get('ATTEMPTS_PER_PAGE', 50)
+    filters = {
+        'quiz_id': request.args.get('quiz_id', type=int),
+        'user_id': request.args.get('user_id', type=int),
+        'date_from': request.args.get('date_from', ''),
+        'date_to': request.args.get('date_to', ''),
+    }
+
+    cursor = request.args.get('before')
+    try:
+        query = attempts_query(filters, before=cursor)
+    except ValueError:
+        abort(400)
+
+    attempts = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(attempts) > per_page:
+        attempts = attempts[:per_page]
+        last = attempts[-1]
+        next_cursor = f"{last.time_stamp_of_attempt.isoformat()}_{last.id}"
+
+    active_filters = {key: value for key, value in filters.items() if value}
+    return render_template('admin/manage_attempts.html',
+                           attempts=attempts,
+                           filters=filters,
+                           active_filters=active_filters,
+                           next_cursor=next_cursor,
+                           is_first_page=not cursor)
 
 @admin_bp.route('/attempts/<int:score_id>/details')
 @admin_required
+@replica_reads
 def view_attempt_details(score_id):
     score_record = Score.query.get_or_404(score_id)
 
-    # Convert raw answers (with string keys) to int keys
-    raw_answers = score_record.answers or {}
-    user_answers = {int(k): v for k, v in raw_answers.items() if k.isdigit()}
-
     quiz = score_record.quiz
 
     return render_template(
         'admin/attempt_details.html',
         score=score_record,
         quiz=quiz,
-        user_answers=user_answers)
+        user_answers=score_record.answers)
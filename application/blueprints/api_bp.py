@@ -1,7 +1,8 @@
 from flask import flash
-from flask import Blueprint, jsonify, redirect, request, url_for
+from flask import Blueprint, current_app, jsonify, redirect, request, url_for
 from flask_login import login_required, current_user
-from application.models import User, Subject, Quiz, Question
+from application.search import search as search_index
+from application.db_routing import replica_reads
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -32,7 +33,7 @@ def internal_error(error):
 
 @api_bp.route('/search', methods=['GET'])
 @login_required
-
+@replica_reads
 def api_search():
     search_term = request.args.get('q', '').strip()
     # Check if the user is authenticated
@@ -44,48 +45,41 @@ def api_search():
     if not search_term:
         return jsonify({}), 200
 
-    if current_user.is_admin:
-        matched_users = User.query.filter(User.username.ilike(f'%{search_term}%')).all()
-        matched_subjects = Subject.query.filter(Subject.name.ilike(f'%{search_term}%')).all()
-        matched_quizzes = Quiz.query.filter(Quiz.quiz_name.ilike(f'%{search_term}%')).all()
-        matched_questions = Question.query.filter(Question.question_statement.ilike(f'%{search_term}%')).all()
-
-        results = {
-            'users': [{
-                'id': u.id,
-                'username': u.username,
-                'email': u.email
-            } for u in matched_users],
-            'subjects': [{
-                'id': s.id,
-                'name': s.name,
-                'description': s.description
-            } for s in matched_subjects],
-            'quizzes': [{
-                'id': q.id,
-                'quiz_name': q.quiz_name
-            } for q in matched_quizzes],
-            'questions': [{
-                'id': ques.id,
-                'question_statement': ques.question_statement,
-                'quiz_id': ques.quiz_id   # Ensure quiz_id is included
-            } for ques in matched_questions]
-        }
-    else:
-        matched_subjects = Subject.query.filter(Subject.name.ilike(f'%{search_term}%')).all()
-        matched_quizzes = Quiz.query.filter(Quiz.quiz_name.ilike(f'%{search_term}%')).all()
+    # Paginate per entity; one extra row tells us whether another page exists
+    per_page = request.args.get('limit', current_app.config['SEARCH_RESULT_LIMIT'], type=int)
+    per_page = min(max(per_page, 1), 100)
+    page = max(request.args.get('page', 1, type=int), 1)
+    entities = ('users', 'subjects', 'quizzes', 'questions') if current_user.is_admin else ('subjects', 'quizzes')
+    matches = search_index(search_term, entities, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_more = {entity: len(found) > per_page for entity, found in matches.items()}
+    matches = {entity: found[:per_page] for entity, found in matches.items()}
 
-        results = {
-            'subjects': [{
-                'id': s.id,
-                'name': s.name,
-                'description': s.description
-            } for s in matched_subjects],
-            'quizzes': [{
-                'id': q.id,
-                'quiz_name': q.quiz_name
-            } for q in matched_quizzes]
-        }
+    results = {}
+    if 'users' in matches:
+        results['users'] = [{
+            'id': u.id,
+            'username': u.username,
+            'email': u.email
+        } for u in matches['users']]
+    results['subjects'] = [{
+        'id': s.id,
+        'name': s.name,
+        'description': s.description
+    } for s in matches['subjects']]
+    results['quizzes'] = [{
+        'id': q.id,
+        'quiz_name': q.quiz_name
+    } for q in matches['quizzes']]
+    if 'questions' in matches:
+        results['questions'] = [{
+            'id': ques.id,
+            'question_statement': ques.question_statement,
+            'quiz_id': ques.quiz_id   # Ensure quiz_id is included
+        } for ques in matches['questions']]
+    results['pagination'] = {
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    }
 
     return jsonify(results), 200
-
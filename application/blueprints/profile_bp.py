@@ -24,7 +24,8 @@ def profile():
 @profile_bp.route('/edit', methods=['GET', 'POST'])
 @login_required
 def edit_profile():
-    # Edit user profile
+    # Edit user profile (current_user is a cached read-only identity, so load the row)
+    user = db.session.get(User, current_user.id)
     form = ProfileForm()
 
     if form.validate_on_submit():
@@ -34,46 +35,46 @@ def edit_profile():
 
         # Remove current avatar if checkbox is checked.
         if form.remove_avatar.data:
-            if current_user.avatar:
-                old_path = os.path.join(upload_folder, current_user.avatar)
+            if user.avatar:
+                old_path = os.path.join(upload_folder, user.avatar)
                 if os.path.exists(old_path):
                     os.remove(old_path)
-            current_user.avatar = None
+            user.avatar = None
         
         # Handle new avatar upload.
         if form.avatar.data:
             file = form.avatar.data
             if file and allowed_file(file.filename):
                 ext = file.filename.rsplit('.', 1)[-1].lower()
-                filename = secure_filename(f"{current_user.id}_{datetime.now(timezone.utc).timestamp()}.{ext}")
+                filename = secure_filename(f"{user.id}_{datetime.now(timezone.utc).timestamp()}.{ext}")
                 file_path = os.path.join(upload_folder, filename)
                 file.save(file_path)
-                current_user.avatar = filename
+                user.avatar = filename
 
         # Update user fields from the form.
-        current_user.full_name = form.full_name.data or current_user.full_name
-        current_user.username = form.username.data or current_user.username
-        current_user.email = form.email.data or current_user.email
-        current_user.dob = form.dob.data if form.dob.data else current_user.dob
-        current_user.bio = form.bio.data or current_user.bio
-        current_user.location = form.location.data or current_user.location
-        current_user.website = form.website.data or current_user.website
-        current_user.qualification = form.qualification.data or current_user.qualification
+        user.full_name = form.full_name.data or user.full_name
+        user.username = form.username.data or user.username
+        user.email = form.email.data or user.email
+        user.dob = form.dob.data if form.dob.data else user.dob
+        user.bio = form.bio.data or user.bio
+        user.location = form.location.data or user.location
+        user.website = form.website.data or user.website
+        user.qualification = form.qualification.data or user.qualification
 
         db.session.commit()
 
         flash('Profile updated successfully', 'success')
-        return redirect(url_for('profile.view', username=current_user.username))
+        return redirect(url_for('profile.view', username=user.username))
     
     # Pre-fill the form fields with current user data for GET request or if form is invalid.
-    form.full_name.data = current_user.full_name
-    form.username.data = current_user.username
-    form.email.data = current_user.email
-    form.dob.data = current_user.dob
-    form.bio.data = current_user.bio
-    form.location.data = current_user.location
-    form.website.data = current_user.website
-    form.qualification.data = current_user.qualification
+    form.full_name.data = user.full_name
+    form.username.data = user.username
+    form.email.data = user.email
+    form.dob.data = user.dob
+    form.bio.data = user.bio
+    form.location.data = user.location
+    form.website.data = user.website
+    form.qualification.data = user.qualification
 
     return render_template('user/profile_edit.html', form=form)
 
@@ -1,7 +1,11 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app, request, abort
 from flask_login import login_required, current_user
-from application.models import Quiz, Score
+from application import db
+from application.models import Quiz, QuizStats, QuestionStats, Score, ScoreHistogram
 from application.decorators import admin_required
+from application.item_analysis import get_item_analysis
+from application.leaderboard import get_leaderboard, top_entries
+from application.db_routing import replica_reads
 
 stats_bp = Blueprint('stats', __name__, url_prefix='/stats')
 
@@ -10,37 +14,113 @@ stats_bp = Blueprint('stats', __name__, url_prefix='/stats')
 # -------------------------
 @stats_bp.route('/quiz_analytics')
 @admin_required
+@replica_reads
 def quiz_analytics():
-    # Generate data for admin quiz statistics
-    quizzes = Quiz.query.all()
+    # Generate data for admin quiz statistics from the per-quiz rollup
+    rows = db.session.query(Quiz.id, Quiz.remarks, QuizStats)\
+                     .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id)\
+                     .order_by(Quiz.id).all()
+    stats = [row.QuizStats for row in rows]
+    distributions = ScoreHistogram.distributions([row.id for row in rows])
+    medians = [distributions[row.id].median if row.id in distributions else None for row in rows]
     return jsonify({
-        'labels': [q.remarks for q in quizzes],
-        'attempts': [len(q.scores) for q in quizzes],
-        'average_scores': [
-            round(sum(s.total_scored for s in q.scores)/len(q.scores), 1) 
-            if q.scores else 0 
-            for q in quizzes
-        ]
+        'labels': [row.remarks for row in rows],
+        'attempts': [s.attempt_count if s else 0 for s in stats],
+        'average_scores': [round(s.average, 1) if s else 0 for s in stats],
+        'std_devs': [round(s.std_dev, 2) if s else 0 for s in stats],
+        'min_scores': [s.min_score if s else None for s in stats],
+        'max_scores': [s.max_score if s else None for s in stats],
+        'median_scores': medians
     })
 
 @stats_bp.route('/question_stats/<int:quiz_id>')
 @admin_required
+@replica_reads
 def question_stats(quiz_id):
-    # Generate question-level statistics for a quiz
-    quiz = Quiz.query.get_or_404(quiz_id)
-    return jsonify([{
-        'question_id': q.id,
-        'correct_percentage': round(
-            (sum(1 for s in quiz.scores if s.total_scored == q.correct_option)/len(quiz.scores))*100, 1
-        ) if quiz.scores else 0
-    } for q in quiz.questions])
+    # Generate question-level statistics for a quiz from the per-question counters
+    Quiz.query.get_or_404(quiz_id)
+    rows = QuestionStats.for_quiz(quiz_id).all()
+    result = []
+    for question_id, stats in rows:
+        attempts = stats.attempt_count if stats else 0
+        option_counts = stats.option_counts if stats else {option: 0 for option in QuestionStats.OPTIONS}
+        result.append({
+            'question_id': question_id,
+            'correct_percentage': stats.correct_percentage if stats else 0,
+            'attempts': attempts,
+            'correct': stats.correct_count if stats else 0,
+            'unanswered': attempts - sum(option_counts.values()),
+            'option_distribution': option_counts
+        })
+    return jsonify(result)
+
+@stats_bp.route('/score_distribution/<int:quiz_id>')
+@login_required
+@replica_reads
+def score_distribution(quiz_id):
+    # Attempts per score, quartiles and the current user's percentile from the score histogram
+    distribution = ScoreHistogram.distribution(quiz_id)
+    if distribution is None:
+        abort(404)
+    own = Score.latest(quiz_id, current_user.id).with_entities(Score.total_scored).first()
+    return jsonify({
+        'quiz_id': quiz_id,
+        'attempts': distribution.attempts,
+        'labels': list(range(len(distribution.counts))),
+        'counts': distribution.counts,
+        'median': distribution.median,
+        'lower_quartile': distribution.quantile(0.25),
+        'upper_quartile': distribution.quantile(0.75),
+        'your_percentile': distribution.percentile(own.total_scored) if own else None
+    })
+
+@stats_bp.route('/item_analysis/<int:quiz_id>')
+@admin_required
+@replica_reads
+def item_analysis(quiz_id):
+    # Difficulty, discrimination and distractor analysis per question (cached per quiz version)
+    Quiz.query.get_or_404(quiz_id)
+    return jsonify(get_item_analysis(quiz_id))
+
+@stats_bp.route('/cache_metrics')
+@admin_required
+def cache_metrics():
+    # Per-worker counters of the in-process caches and single-flight coalescing
+    names = ('singleflight', 'quiz_content', 'content_tree', 'answer_keys', 'fragments', 'item_analysis', 'user_cache',
+             'leaderboards', 'warming', 'replica_sync')
+    return jsonify({name: current_app.extensions[name].stats()
+                    for name in names if name in current_app.extensions})
+
+@stats_bp.route('/leaderboard/<int:quiz_id>')
+@login_required
+@replica_reads
+def leaderboard(quiz_id):
+    # Top attempts for a quiz plus the current user's rank (ties go to the earlier submission)
+    board = get_leaderboard(quiz_id)
+    if board is None:
+        abort(404)
+    limit = min(request.args.get('limit', current_app.config.get('LEADERBOARD_TOP_N', 10), type=int), 100)
+    top = top_entries(board, limit)
+
+    own = Score.latest(quiz_id, current_user.id).first()
+    return jsonify({
+        'quiz_id': quiz_id,
+        'attempts': len(board),
+        'top': [{
+            'rank': entry['rank'],
+            'username': entry['username'],
+            'score': entry['score'],
+            'submitted_at': entry['submitted_at'].isoformat() if entry['submitted_at'] else None
+        } for entry in top],
+        'your_rank': board.rank(own.total_scored, own.time_stamp_of_attempt, own.id) if own else None
+    })
 
 @stats_bp.route('/user/performance')
 @login_required
+@replica_reads
 def user_performance():
     # Generate user's historical performance data
-    scores = Score.query.filter_by(user_id=current_user.id) \
-                      .order_by(Score.time_stamp_of_attempt).all()
+    scores = Score.history(current_user.id, newest_first=False).all()
     return jsonify({
         'labels': [s.quiz.remarks for s in scores],
         'scores': [s.total_scored for s in scores],
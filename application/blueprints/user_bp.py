@@ -1,28 +1,39 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, abort
 from flask_login import login_required, current_user
+from flask_wtf.csrf import generate_csrf
 from application import db
-from application.models import Quiz, Score, Subject
-from application.utils import calculate_score
-from datetime import datetime, timedelta  
+from application.models import Quiz, Score, ScoreHistogram
+from application.submissions import DuplicateSubmission, SubmissionBusy, submit_score
+from application.answer_keys import get_answer_key
+from application.fragments import render_quiz_questions
+from application.quiz_content import get_quiz_content
+from application.leaderboard import get_leaderboard, top_entries
+from application.content_tree import get_content_tree
+from application.read_models import score_rows
+from application.db_routing import replica_reads
+from datetime import datetime
 
 user_bp = Blueprint('user', __name__, url_prefix='/user')
 
 @user_bp.route('/dashboard')
 @login_required
+@replica_reads
 def dashboard():
-    
-    # Fetch all quizzes then filter out the ended ones
-    all_quizzes = Quiz.query.all()
-    available_quizzes = [quiz for quiz in all_quizzes if quiz.status in ("Active", "Upcoming")]
-
-    # Fetch past scores (attempt history)
-    past_scores = Score.query.filter_by(user_id=current_user.id)\
-                             .order_by(Score.time_stamp_of_attempt.desc())\
-                             .all()
+    # Subjects, chapters and quizzes come from the shared hierarchy snapshot
+    tree = get_content_tree()
+
+    # Only active and upcoming quizzes: the ids come from the indexed range scan on
+    # effective_end_time (historical quizzes are never read), the nodes from the snapshot; a quiz
+    # another worker created since the snapshot was built is loaded directly
+    available_quizzes = [tree.quiz(quiz_id) or db.session.get(Quiz, quiz_id)
+                         for (quiz_id,) in Quiz.available().with_entities(Quiz.id)]
+
+    # Fetch past scores (attempt history) without their answer sheets
+    past_scores = score_rows(current_user.id)
     total_attempts = len(past_scores)
 
-    # Query subjects for performance overview 
-    subjects = Subject.query.all()
+    # Subjects for performance overview
+    subjects = tree.subjects
 
     return render_template(
         'user/dashboard.html',
@@ -36,17 +47,21 @@ def dashboard():
 @user_bp.route('/quiz/<int:quiz_id>/attempt', methods=['GET', 'POST'])
 @login_required
 def attempt_quiz(quiz_id):
-    quiz = Quiz.query.get_or_404(quiz_id)
+    # Shared read-only snapshot (concurrent misses coalesced); submissions re-read the row so
+    # grading always sees the current content_version
+    quiz = get_quiz_content(quiz_id, fresh=request.method == 'POST')
+    if quiz is None:
+        abort(404)
     current_time = datetime.now()
-    computed_end_time = quiz.end_time or (quiz.start_time + timedelta(minutes=quiz.duration))
+    computed_end_time = quiz.effective_end_time or quiz.compute_end_time()
     
     # Prevent accessing upcoming quizzes
     if current_time < quiz.start_time:
         flash(f'Quiz opens at {quiz.start_time.strftime("%d %b %Y, %I:%M %p")}', 'warning')
         return redirect(url_for('user.dashboard'))
 
-    existing_score = Score.query.filter_by(quiz_id=quiz_id, user_id=current_user.id).first()
-    if existing_score:
+    # Submissions skip this lookup: the insert itself rejects a second attempt (see below)
+    if request.method == 'GET' and db.session.query(Score.latest(quiz_id, current_user.id).exists()).scalar():
         flash('Already attempted', 'info')
         return redirect(url_for('user.results', quiz_id=quiz_id))
 
@@ -56,26 +71,23 @@ def attempt_quiz(quiz_id):
             return redirect(url_for('user.dashboard'))
         
         try:
-            total_score = calculate_score(quiz, request.form)
-            user_answers = {
-                question.id: int(request.form.get(f"question_{question.id}"))
-                for question in quiz.questions
-                if request.form.get(f"question_{question.id}")
-            }
-            
-            new_score = Score(
-                quiz_id=quiz.id,
-                user_id=current_user.id,
-                total_scored=total_score,
-                time_stamp_of_attempt=datetime.now(),
-                answers=user_answers
-            )
-            db.session.add(new_score)
-            db.session.commit()
+            # Grade and extract answers in one pass over the cached answer key (no Question loads)
+            answer_key = get_answer_key(quiz)
+            total_score, user_answers = answer_key.grade(request.form)
+
+            # Returns only once the score is committed (batched with concurrent submissions);
+            # a single INSERT ... ON CONFLICT DO NOTHING, so a repeated submission stores nothing
+            submit_score(quiz.id, current_user.id, total_score, user_answers, datetime.now(), list(answer_key.items()))
             
-            flash(f'Score: {total_score}/{len(quiz.questions)}', 'success')
+            flash(f'Score: {total_score}/{len(answer_key)}', 'success')
             return redirect(url_for('user.results', quiz_id=quiz.id))
         
+        except DuplicateSubmission:
+            flash('Already attempted', 'info')
+            return redirect(url_for('user.results', quiz_id=quiz.id))
+        except SubmissionBusy:
+            flash('Too many submissions right now, please submit again in a moment', 'warning')
+            return redirect(url_for('user.attempt_quiz', quiz_id=quiz.id))
         except Exception as e:
             db.session.rollback()
             flash('Submission failed', 'danger')
@@ -85,73 +97,72 @@ def attempt_quiz(quiz_id):
     return render_template(
         'user/quiz_attempt.html',
         quiz=quiz,
-        questions=quiz.questions,
+        questions_html=render_quiz_questions(quiz),  # shared, cached per content_version
+        csrf_token=generate_csrf(),
         end_time=computed_end_time,
         is_active=current_time <= computed_end_time)
 
 
 @user_bp.route('/quiz/<int:quiz_id>/results')
 @login_required
+@replica_reads
 def results(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
-    score = Score.query.filter_by(
-        quiz_id=quiz_id,
-        user_id=current_user.id
-    ).order_by(Score.time_stamp_of_attempt.desc()).first()
+    score = Score.latest(quiz_id, current_user.id).first()
     
     if not score:
         flash('No attempt found for this quiz', 'warning')
         return redirect(url_for('user.dashboard'))
         
-    raw_answers = score.answers  # string representation of the dictionary
-    # Convert keys to int
-    user_answers = {int(k): v for k, v in raw_answers.items()}
+    # O(log n) rank from the in-memory leaderboard instead of counting better scores
+    leaderboard = get_leaderboard(quiz_id)
+    # Percentile and median from the quiz's score histogram (one row per possible score)
+    distribution = ScoreHistogram.distribution(quiz_id)
 
     return render_template(
         'user/results.html',
         quiz=quiz,
         score=score,
-        user_answers=user_answers
+        user_answers=score.answers,  # {question_id: option}
+        rank=leaderboard.rank(score.total_scored, score.time_stamp_of_attempt, score.id),
+        ranked_attempts=len(leaderboard),
+        leaderboard_top=top_entries(leaderboard, current_app.config.get('LEADERBOARD_TOP_N', 10)),
+        percentile=distribution.percentile(score.total_scored),
+        median_score=distribution.median,
+        score_distribution=distribution.counts
     )
 
 
 
 @user_bp.route('/summary')
 @login_required
+@replica_reads
 def summary():
     # Get all subjects
-    subjects = Subject.query.all()
+    tree = get_content_tree()
+    subjects = tree.subjects
     
-    # Get past scores for the current user in chronological order
-    past_scores = Score.query.filter_by(user_id=current_user.id)\
-                             .order_by(Score.time_stamp_of_attempt.asc())\
-                             .all()
+    # Get past scores for the current user in chronological order; quiz/chapter/subject come from the tree
+    past_scores = Score.history(current_user.id, newest_first=False).all()
 
-    # build data for subject-wise performance chart
+    # build data for subject-wise performance chart (one GROUP BY over the user's scores)
+    subject_averages = dict(Score.subject_averages(current_user.id).all())
     subject_labels = [subject.name for subject in subjects]
-    subject_avg_scores = []
-    for subject in subjects:
-        # filter score for this subject
-        subject_scores = [score.total_scored for score in past_scores 
-                          if score.quiz.chapter.subject.id == subject.id]
-        avg = sum(subject_scores) / len(subject_scores) if subject_scores else 0
-        subject_avg_scores.append(avg)
+    subject_avg_scores = [subject_averages.get(subject.id, 0) for subject in subjects]
     
     # build data for quiz score chart using quiz_name instead of remarks
     quiz_labels = [
-        f"{score.quiz.quiz_name} - {score.quiz.chapter.subject.name}"
-        for score in past_scores
+        f"{quiz.quiz_name} - {quiz.chapter.subject.name}"
+        for quiz in (tree.quiz(score.quiz_id) or score.quiz for score in past_scores)
     ] if past_scores else []
     quiz_scores = [score.total_scored for score in past_scores] if past_scores else []
     
     # build subject max scores dictionary: key = subject name; value = {max_score, quiz_name}
-    subject_max_scores = {}
-    for score in past_scores:
-        subject_name = score.quiz.chapter.subject.name
-        if subject_name not in subject_max_scores or score.total_scored > subject_max_scores[subject_name]["max_score"]:
-            subject_max_scores[subject_name] = {
-                "max_score": score.total_scored,
-                "quiz_name": score.quiz.quiz_name}
+    # the earliest attempt wins ties, and subjects appear in order of first attempt
+    subject_max_scores = {
+        row.subject_name: {"max_score": row.total_scored, "quiz_name": row.quiz_name}
+        for row in Score.best_per_subject(current_user.id)
+    }
     
     return render_template(
         'user/summary.html',
@@ -166,10 +177,9 @@ def summary():
 
 @user_bp.route('/attempt-history')
 @login_required
+@replica_reads
 def attempt_history():
-    past_scores = Score.query.filter_by(user_id=current_user.id)\
-                             .order_by(Score.time_stamp_of_attempt.desc())\
-                             .all()
+    past_scores = Score.history(current_user.id).all()
     
     return render_template(
         'user/attempt_history.html',
@@ -178,8 +188,7 @@ def attempt_history():
 
 @user_bp.route('/scores')
 @login_required
+@replica_reads
 def scores():
-    past_scores = Score.query.filter_by(user_id=current_user.id)\
-                             .order_by(Score.time_stamp_of_attempt.desc())\
-                             .all()
+    past_scores = Score.history(current_user.id).all()
     return render_template('user/scores.html', scores=past_scores)
\ No newline at end of file
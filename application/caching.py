@@ -0,0 +1,193 @@
+# Small in-process caches shared by the app (one instance per worker process).
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional per-entry TTL, memory budget and hit/miss counters.
+
+    With `max_bytes`, entries are weighed with `sizeof(value)` and the least recently used ones
+    are evicted until the total fits the budget.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, max_bytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()  # key -> (expires_at, value, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value, size = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.bytes -= size
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        size = self.sizeof(value) if self.max_bytes and self.sizeof else 0
+        if self.max_bytes and size > self.max_bytes:
+            self.pop(key)
+            return  # larger than the whole budget; never cached
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._data[key] = (expires_at, value, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes and self.bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[2]
+        return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the load; callers arriving while it is in flight
+    wait for and share its result or exception instead of repeating it. Results are shared between
+    threads, so loads must return immutable or detached values, never session-bound ORM objects.
+    Built on threading primitives, which gevent's monkey patching makes cooperative, so it works
+    for threaded and gevent workers alike. A waiter that times out runs the load itself.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def do(self, key, load):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                return load()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = load()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.loads += 1
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        return {
+            'in_flight': len(self._flights),
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+        }
+
+# --- Work deferred to commit ---
+# Model events fire at flush, before the data is visible to other sessions. Callbacks queued here
+# run once the session's outermost transaction ends: after a commit, and after a rollback only if
+# they were queued as invalidations; a savepoint rollback leaves them queued. Callbacks are keyed,
+# so a row flushed several times in one transaction queues one call (the latest one wins).
+
+_PENDING = 'pending_callbacks'
+
+def after_commit(session, key, callback):
+    """Run callback() after the session's current transaction commits; dropped on rollback."""
+    if session is not None:
+        session.info.setdefault(_PENDING, {})[key] = (callback, False)
+
+def pending_commit(session, key):
+    """Whether a callback for key is waiting for the session's transaction to end."""
+    return session is not None and key in session.info.get(_PENDING, ())
+
+def invalidate_after_commit(session, key, invalidate):
+    """Invalidate a cache entry now and again when the transaction ends.
+
+    Invalidating at flush alone is not enough: until the commit, a concurrent cache miss can
+    still read the old row and cache it again, so the entry is dropped once more after commit.
+    On rollback it is dropped as well, since this session may have cached rows it never committed.
+    """
+    invalidate()
+    if session is not None:
+        session.info.setdefault(_PENDING, {})[key] = (invalidate, True)
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session):
+    for callback, _ in session.info.pop(_PENDING, {}).values():
+        callback()
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _run_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is not None:
+        return  # savepoint; the outer transaction can still commit
+    for callback, on_rollback in session.info.pop(_PENDING, {}).values():
+        if on_rollback:
+            callback()
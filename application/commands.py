@@ -0,0 +1,155 @@
+import click
+from application.extensions import db
+
+def register_commands(app):
+    # Maintenance commands for backfills and rebuilds
+
+    @app.cli.command("rebuild-stats")
+    @click.option("--quiz", "quiz_ids", type=int, multiple=True, help="Only rebuild these quiz ids.")
+    @click.option("--batch-size", default=1000, show_default=True, help="Scores parsed per batch.")
+    def rebuild_stats(quiz_ids, batch_size):
+        """Recompute the per-quiz, score histogram and per-question rollups from the scores table."""
+        from application.models import QuizStats, QuestionStats, ScoreHistogram
+
+        quiz_ids = list(quiz_ids) or None
+        quiz_count = QuizStats.rebuild(quiz_ids)
+        ScoreHistogram.rebuild(quiz_ids)
+        question_count = QuestionStats.rebuild(quiz_ids, batch_size=batch_size)
+        db.session.commit()
+        print(f"Rebuilt stats for {quiz_count} quizzes and {question_count} questions.")
+
+    @app.cli.command("sync-replica")
+    def sync_replica():
+        """Copy the primary SQLite database onto the local read replica now."""
+        replica_sync = app.extensions.get('replica_sync')
+        if replica_sync is None:
+            print("No local SQLite replica is configured (REPLICA_DATABASE_URL / REPLICA_SYNC_INTERVAL).")
+            return
+        replica_sync.sync()
+        print(f"Replica synced in {replica_sync.last_seconds * 1000:.1f} ms.")
+
+    @app.cli.command("reindex-search")
+    def reindex_search():
+        """Create (if needed) and rebuild the SQLite FTS5 search index."""
+        from application.search import reindex
+
+        if reindex():
+            print("Search index rebuilt.")
+        else:
+            print("Full-text index is only available on SQLite; searches use LIKE scans.")
+
+    @app.cli.command("import-questions")
+    @click.argument("quiz_id", type=int)
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Defaults to the file extension.")
+    @click.option("--batch-size", default=500, show_default=True, help="Rows per executemany batch.")
+    def import_questions_command(quiz_id, path, fmt, batch_size):
+        """Stream-import questions for a quiz from a CSV or JSONL file."""
+        from application.models import Quiz
+        from application.question_import import detect_format, import_questions
+
+        quiz = db.session.get(Quiz, quiz_id)
+        if quiz is None:
+            raise click.ClickException(f"Quiz {quiz_id} not found.")
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            result = import_questions(quiz, stream, fmt or detect_format(path), batch_size=batch_size)
+
+        for row_number, errors in result.errors:
+            messages = "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in errors.items())
+            print(f"Row {row_number} skipped - {messages}")
+        print(f"Imported {result.inserted} questions into quiz {quiz_id} ({len(result.errors)} rows skipped).")
+
+    @app.cli.command("item-analysis")
+    @click.argument("quiz_id", type=int)
+    @click.option("--chunk-size", default=5000, show_default=True, help="Attempts decoded per chunk.")
+    @click.option("--json", "as_json", is_flag=True, help="Print the full analysis as JSON.")
+    def item_analysis(quiz_id, chunk_size, as_json):
+        """Report difficulty, discrimination and distractor statistics for a quiz's questions."""
+        import json
+        from application.item_analysis import analyze_quiz
+
+        try:
+            analysis = analyze_quiz(quiz_id, chunk_size=chunk_size)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        if as_json:
+            print(json.dumps(analysis, indent=2))
+            return
+
+        def fmt(value):
+            return "-" if value is None else f"{value:.3f}"
+
+        print(f"Quiz {quiz_id}: {analysis['attempts']} attempts, {len(analysis['items'])} questions")
+        print(f"{'question':>9} {'p':>6} {'r_pb':>6} {'r_it':>6} {'D':>6}  option picks (upper/lower)")
+        for item in analysis['items']:
+            picks = "  ".join(
+                f"{'*' if d['correct'] else ' '}{d['option']}:{d['count']} ({d['upper_count']}/{d['lower_count']})"
+                for d in item['distractors'])
+            print(f"{item['question_id']:>9} {fmt(item['difficulty']):>6} {fmt(item['point_biserial']):>6} "
+                  f"{fmt(item['corrected_point_biserial']):>6} {fmt(item['discrimination_index']):>6}  {picks}")
+
+    @app.cli.command("warm-quiz")
+    @click.argument("quiz_id", type=int)
+    def warm_quiz_command(quiz_id):
+        """Preload a quiz's snapshot, answer key and rendered questions and report the cost."""
+        from application.warming import warm_quiz
+
+        result = warm_quiz(quiz_id)
+        if not result.found:
+            raise click.ClickException(f"Quiz {quiz_id} not found.")
+        print(f"Warmed quiz {quiz_id}: {result.questions} questions, "
+              f"{result.fragment_bytes} bytes of rendered HTML in {result.seconds * 1000:.1f} ms.")
+
+    @app.cli.command("rebuild-leaderboard")
+    @click.option("--quiz", "quiz_ids", type=int, multiple=True, help="Only rebuild these quiz ids.")
+    @click.option("--top", default=10, show_default=True, help="Entries to print per quiz.")
+    def rebuild_leaderboard(quiz_ids, top):
+        """Rebuild quiz leaderboards from the scores table and print the top entries."""
+        import time
+        from application.models import Quiz
+        from application.leaderboard import build_leaderboard
+
+        quizzes = db.session.query(Quiz.id, Quiz.content_version)
+        if quiz_ids:
+            quizzes = quizzes.filter(Quiz.id.in_(quiz_ids))
+        for quiz_id, version in quizzes.order_by(Quiz.id).all():
+            started = time.perf_counter()
+            board = build_leaderboard(quiz_id, version)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"Quiz {quiz_id}: {len(board)} attempts ranked in {elapsed:.1f} ms")
+            for rank, score_id, user_id, total, submitted_at in board.top(top):
+                print(f"  {rank:>4}. user {user_id} - {total} (score {score_id}, {submitted_at})")
+
+    @app.cli.command("regrade")
+    @click.option("--quiz", "quiz_ids", type=int, multiple=True, required=True, help="Quiz id to regrade (repeatable).")
+    @click.option("--chunk-size", default=5000, show_default=True, help="Attempts per read/update chunk.")
+    def regrade(quiz_ids, chunk_size):
+        """Rescore stored attempts against the quiz's current answer key."""
+        from application.regrade import regrade_quiz
+
+        for quiz_id in quiz_ids:
+            try:
+                result = regrade_quiz(quiz_id, chunk_size=chunk_size)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            print(f"Quiz {quiz_id}: regraded {result.attempts} attempts, {result.changed} scores changed.")
+
+    @app.cli.command("check-query-plans")
+    @click.option("--verbose", "-v", is_flag=True, help="Print the plan of every query, not only regressions.")
+    def check_query_plans_command(verbose):
+        """EXPLAIN the hot queries and fail if any of them scans a whole table."""
+        from application.query_plans import check_query_plans
+
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException("Query plans are only checked on SQLite.")
+        failures = 0
+        for name, plan, scans in check_query_plans():
+            if scans:
+                failures += 1
+            if scans or verbose:
+                print(f"{'FULL SCAN' if scans else 'ok':<9} {name}")
+                for line in plan:
+                    print(f"            {line}")
+        if failures:
+            raise click.ClickException(f"{failures} hot queries scan whole tables; add or fix their indexes.")
+        print("All hot queries use indexes.")
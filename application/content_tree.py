@@ -0,0 +1,165 @@
+# In-process snapshot of the Subject -> Chapter -> Quiz hierarchy.
+# The tree is small and rarely changes, so read paths (dashboards, admin listings) walk immutable
+# nodes instead of querying and lazy-loading ORM relationships. Commits touching a subject,
+# chapter or quiz bump the version and the next reader rebuilds it with three column-projected
+# queries. Other workers' edits are picked up once CONTENT_TREE_TTL expires.
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from application.extensions import db
+from application.models import Subject, Chapter, Quiz
+from application.caching import invalidate_after_commit
+from application.quiz_content import single_flight
+
+class _Node:
+    """Read-only node; attributes are set once while the tree is built."""
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only; load the model to make changes")
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id} - {self.name}>"
+
+class SubjectNode(_Node):
+    __slots__ = ('id', 'name', 'description', 'chapters')
+
+class ChapterNode(_Node):
+    __slots__ = ('id', 'name', 'description', 'subject_id', 'subject', 'quizzes')
+
+class QuizNode(_Node):
+    __slots__ = ('id', 'quiz_name', 'start_time', 'end_time', 'effective_end_time', 'duration',
+                 'remarks', 'chapter_id', 'chapter')
+
+    compute_end_time = Quiz.compute_end_time
+    status = Quiz.status
+
+    @property
+    def name(self):
+        return self.quiz_name
+
+class ContentTree:
+    def __init__(self, version, subjects, chapters, quizzes):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.subjects = subjects                      # ordered by id, like Subject.query.all()
+        self._subjects = {s.id: s for s in subjects}
+        self._chapters = {c.id: c for c in chapters}
+        self._quizzes = {q.id: q for q in quizzes}
+
+    def subject(self, subject_id):
+        return self._subjects.get(subject_id)
+
+    def chapter(self, chapter_id):
+        return self._chapters.get(chapter_id)
+
+    def quiz(self, quiz_id):
+        return self._quizzes.get(quiz_id)
+
+    @property
+    def counts(self):
+        return {'subjects': len(self._subjects), 'chapters': len(self._chapters), 'quizzes': len(self._quizzes)}
+
+def build_content_tree(version):
+    subjects = [SubjectNode(**row._asdict()) for row in
+                db.session.query(Subject.id, Subject.name, Subject.description).order_by(Subject.id)]
+    chapters = [ChapterNode(**row._asdict()) for row in
+                db.session.query(Chapter.id, Chapter.name, Chapter.description, Chapter.subject_id)
+                          .order_by(Chapter.id)]
+    quizzes = [QuizNode(**row._asdict()) for row in
+               db.session.query(Quiz.id, Quiz.quiz_name, Quiz.start_time, Quiz.end_time, Quiz.effective_end_time,
+                                Quiz.duration, Quiz.remarks, Quiz.chapter_id)
+                         .order_by(Quiz.id)]
+
+    # Wire parent and child links before anyone can see the nodes
+    subject_by_id = {subject.id: subject for subject in subjects}
+    chapter_by_id = {chapter.id: chapter for chapter in chapters}
+    children = {}
+    for quiz in quizzes:
+        object.__setattr__(quiz, 'chapter', chapter_by_id.get(quiz.chapter_id))
+        children.setdefault(('chapter', quiz.chapter_id), []).append(quiz)
+    for chapter in chapters:
+        object.__setattr__(chapter, 'subject', subject_by_id.get(chapter.subject_id))
+        object.__setattr__(chapter, 'quizzes', tuple(children.get(('chapter', chapter.id), ())))
+        children.setdefault(('subject', chapter.subject_id), []).append(chapter)
+    for subject in subjects:
+        object.__setattr__(subject, 'chapters', tuple(children.get(('subject', subject.id), ())))
+    return ContentTree(version, tuple(subjects), chapters, quizzes)
+
+class ContentTreeCache:
+    def __init__(self, ttl=10):
+        self.ttl = ttl
+        self.version = 1
+        self.builds = 0
+        self.hits = 0
+        self._tree = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        tree = self._tree
+        if tree is None or tree.version != self.version or time.monotonic() - tree.built_at > self.ttl:
+            return None
+        self.hits += 1
+        return tree
+
+    def store(self, tree):
+        with self._lock:
+            if tree.version == self.version:
+                self._tree = tree
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+
+    def stats(self):
+        tree = self._tree
+        return {
+            'version': self.version,
+            'builds': self.builds,
+            'hits': self.hits,
+            'age': round(time.monotonic() - tree.built_at, 1) if tree else None,
+            **(tree.counts if tree else {}),
+        }
+
+def init_content_tree(app):
+    app.extensions['content_tree'] = ContentTreeCache(ttl=app.config.get('CONTENT_TREE_TTL', 10))
+
+def get_content_tree():
+    """Current snapshot of the content hierarchy, rebuilt lazily after changes."""
+    cache = current_app.extensions['content_tree']
+    tree = cache.current()
+    if tree is None:
+        version = cache.version
+
+        def load():
+            cache.builds += 1
+            return build_content_tree(version)
+
+        tree = single_flight(('content_tree', version), load)
+        cache.store(tree)
+    return tree
+
+def bump_content_tree():
+    cache = current_app.extensions.get('content_tree') if has_app_context() else None
+    if cache is not None:
+        cache.bump()
+
+# --- Versioning through model events ---
+
+@event.listens_for(Subject, 'after_insert')
+@event.listens_for(Subject, 'after_update')
+@event.listens_for(Subject, 'after_delete')
+@event.listens_for(Chapter, 'after_insert')
+@event.listens_for(Chapter, 'after_update')
+@event.listens_for(Chapter, 'after_delete')
+@event.listens_for(Quiz, 'after_insert')
+@event.listens_for(Quiz, 'after_update')
+@event.listens_for(Quiz, 'after_delete')
+def _hierarchy_changed(mapper, connection, target):
+    invalidate_after_commit(object_session(target), 'content_tree', bump_content_tree)
@@ -0,0 +1,159 @@
+# Read/write routing between the primary database and an optional read replica.
+# Views marked with @replica_reads (analytics, search, dashboards, listings) send their SELECTs
+# to the 'replica' bind; flushes and DML always go to the primary, and once a request has
+# written, the rest of it stays on the primary. A user who wrote keeps reading from the
+# primary for READ_YOUR_WRITES_WINDOW seconds (tracked in their session cookie, so it holds
+# across workers) while the replica catches up. Shared caches load through on_primary() so a
+# lagging replica never seeds them. For local use, a second SQLite file is refreshed from the
+# primary with the SQLite online backup API every REPLICA_SYNC_INTERVAL seconds.
+import atexit
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from application.utils import start_on_first_request
+
+REPLICA_BIND = 'replica'
+PRIMARY_UNTIL = '_primary_until'  # session key: epoch seconds until which reads use the primary
+
+def _use_replica():
+    return (has_app_context() and g.get('read_replica', False)
+            and not g.get('db_wrote', False) and not g.get('force_primary', 0))
+
+class RoutingSession(FlaskSession):
+    """Flask-SQLAlchemy session that sends reads of replica-enabled requests to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if isinstance(clause, UpdateBase):
+                mark_recent_write()
+            elif not self._flushing and _use_replica():
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def replica_reads(view):
+    """Serve the view's reads from the replica unless the user wrote recently."""
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        if time.time() >= session.get(PRIMARY_UNTIL, 0):
+            g.read_replica = True
+        return view(*args, **kwargs)
+    return decorated_view
+
+@contextmanager
+def on_primary():
+    """Force reads inside the block to the primary (loads that seed shared caches)."""
+    if not has_app_context():
+        yield
+        return
+    g.force_primary = g.get('force_primary', 0) + 1
+    try:
+        yield
+    finally:
+        g.force_primary -= 1
+
+def mark_recent_write():
+    """Keep this request, and the user's next ones for a while, on the primary."""
+    if has_app_context():
+        g.db_wrote = True
+
+@event.listens_for(Session, 'after_flush')
+def _flushed(session, flush_context):
+    mark_recent_write()
+
+class ReplicaSync:
+    """Copies a primary SQLite file onto the replica file with the online backup API."""
+
+    def __init__(self, app, primary_path, replica_path, interval=5):
+        self.app = app
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.interval = interval
+        self.syncs = 0
+        self.last_sync = None
+        self.last_seconds = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self):
+        """Copy the primary onto the replica as one consistent snapshot."""
+        with self._lock:
+            started = time.perf_counter()
+            source = sqlite3.connect(self.primary_path)
+            target = sqlite3.connect(self.replica_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.syncs += 1
+            self.last_sync = time.time()
+            self.last_seconds = time.perf_counter() - started
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self.sync()  # the replica must hold the schema before the first routed read
+                thread = threading.Thread(target=self._run, name='replica-sync', daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception:
+                self.app.logger.exception("Replica sync failed")
+
+    def close(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'syncs': self.syncs,
+            'lag': round(time.time() - self.last_sync, 1) if self.last_sync else None,
+            'last_seconds': round(self.last_seconds, 3) if self.last_seconds is not None else None,
+        }
+
+def configure_replica(app):
+    """Register the replica bind from REPLICA_DATABASE_URL; call before db.init_app."""
+    url = app.config.get('REPLICA_DATABASE_URL')
+    if url:
+        app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), REPLICA_BIND: url}
+
+def init_replica(app):
+    if not app.config.get('REPLICA_DATABASE_URL'):
+        return None
+    window = app.config.get('READ_YOUR_WRITES_WINDOW', 15)
+
+    @app.after_request
+    def remember_write(response):
+        if g.get('db_wrote', False):
+            session[PRIMARY_UNTIL] = time.time() + window
+        return response
+
+    with app.app_context():
+        engines = current_app.extensions['sqlalchemy'].engines
+        primary, replica = engines[None], engines[REPLICA_BIND]
+    interval = app.config.get('REPLICA_SYNC_INTERVAL', 5)
+    if not interval or primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        return None  # replicated outside the app
+
+    replica_sync = ReplicaSync(app, primary.url.database, replica.url.database, interval=interval)
+    app.extensions['replica_sync'] = replica_sync
+    atexit.register(replica_sync.close)
+
+    start_on_first_request(app, replica_sync.ensure_started)
+    return replica_sync
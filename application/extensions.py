@@ -3,9 +3,10 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
+from application.db_routing import RoutingSession
 
-# Initialize SQLAlchemy extension for database operations 
-db = SQLAlchemy()
+# Initialize SQLAlchemy extension for database operations (reads may be routed to a replica)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 csrf = CSRFProtect()
\ No newline at end of file
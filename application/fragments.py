@@ -0,0 +1,35 @@
+# Rendered-fragment cache for the quiz attempt page.
+# The question body is identical for every student, so it is rendered once per
+# (quiz id, content_version) and reused; only the timer and CSRF token are rendered per request.
+import sys
+from flask import current_app, render_template
+from markupsafe import Markup
+from application.caching import LRUCache
+from application.models import Question
+from application.quiz_content import single_flight
+
+def init_fragment_cache(app):
+    app.extensions['fragments'] = LRUCache(
+        maxsize=app.config.get('FRAGMENT_CACHE_SIZE', 256),
+        max_bytes=app.config.get('FRAGMENT_CACHE_BYTES', 32 * 1024 * 1024),
+        sizeof=lambda entry: sys.getsizeof(entry[1]))
+
+def _render(quiz):
+    questions = Question.for_quiz(quiz.id).all()
+    return Markup(render_template('partials/quiz_questions.html', quiz=quiz, questions=questions))
+
+def render_quiz_questions(quiz):
+    """Rendered question body for the quiz's current content_version (a Quiz or QuizContent)."""
+    cache = current_app.extensions['fragments']
+    entry = cache.get(quiz.id)
+    if entry is None or entry[0] != quiz.content_version:
+        # Concurrent misses for the same version share one render
+        html = single_flight(('fragment', quiz.id, quiz.content_version), lambda: _render(quiz))
+        entry = (quiz.content_version, html)
+        cache.set(quiz.id, entry)
+    return entry[1]
+
+def invalidate_quiz_fragments(quiz_id):
+    cache = current_app.extensions.get('fragments')
+    if cache is not None:
+        cache.pop(quiz_id)
@@ -0,0 +1,163 @@
+# Psychometric item analysis over stored attempts.
+# For every question of a quiz: difficulty (p-value), discrimination (point-biserial and the
+# upper/lower 27% index) and a distractor breakdown. Answers are streamed in chunks into int8
+# matrices and folded into running sums, so memory stays bounded by the chunk size.
+import numpy as np
+from flask import current_app
+from application.caching import LRUCache
+from application.extensions import db
+from application.models import Quiz, Score, QuizStats
+from application.answer_keys import answer_matrix, compile_answer_key
+
+GROUP_FRACTION = 0.27
+OPTIONS = (1, 2, 3, 4)
+
+def _group_cutoffs(quiz_id):
+    # Score thresholds for the lower and upper 27% groups, from the totals histogram.
+    # Ties at a threshold stay in the group, as is usual for the classical index.
+    histogram = db.session.query(Score.total_scored, db.func.count(Score.id))\
+                          .filter(Score.quiz_id == quiz_id)\
+                          .group_by(Score.total_scored)\
+                          .order_by(Score.total_scored).all()
+    attempts = sum(count for _, count in histogram)
+    if not attempts:
+        return 0, None, None
+    needed = max(1, round(GROUP_FRACTION * attempts))
+    lower = upper = None
+    seen = 0
+    for total, count in histogram:
+        seen += count
+        if seen >= needed:
+            lower = total
+            break
+    seen = 0
+    for total, count in reversed(histogram):
+        seen += count
+        if seen >= needed:
+            upper = total
+            break
+    return attempts, lower, upper
+
+def _ratio(numerator, denominator):
+    # Element-wise division that yields NaN (reported as null) where the denominator is 0
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.broadcast_to(np.asarray(denominator, dtype=np.float64), numerator.shape)
+    out = np.full(numerator.shape, np.nan)
+    return np.divide(numerator, denominator, out=out, where=denominator > 0)
+
+def _round(value, digits=3):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+def analyze_quiz(quiz_id, chunk_size=5000):
+    """Item statistics for every question of a quiz, computed from all stored attempts."""
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise ValueError(f"Quiz {quiz_id} not found")
+    key = compile_answer_key(quiz.id, quiz.content_version)
+    correct = key.correct_array()
+    n_questions = len(key)
+    _, lower_cutoff, upper_cutoff = _group_cutoffs(quiz.id)
+
+    attempts = 0
+    total_sum = total_sq_sum = 0.0
+    correct_counts = np.zeros(n_questions, dtype=np.int64)
+    correct_total_sums = np.zeros(n_questions, dtype=np.float64)  # sum of totals over correct answers
+    picks = np.zeros((len(OPTIONS) + 1, n_questions), dtype=np.int64)  # row 0 = unanswered
+    upper_picks = np.zeros_like(picks)
+    lower_picks = np.zeros_like(picks)
+    upper_size = lower_size = 0
+
+    query = db.select(Score.total_scored, Score.answers_raw)\
+              .where(Score.quiz_id == quiz.id)\
+              .execution_options(yield_per=chunk_size)
+    for chunk in db.session.execute(query).partitions():
+        matrix = answer_matrix((row[1] for row in chunk), key, len(chunk))
+        totals = np.fromiter((row[0] for row in chunk), dtype=np.float64, count=len(chunk))
+        is_correct = matrix == correct
+        upper = totals >= upper_cutoff
+        lower = totals <= lower_cutoff
+
+        attempts += len(chunk)
+        total_sum += totals.sum()
+        total_sq_sum += (totals * totals).sum()
+        correct_counts += is_correct.sum(axis=0)
+        correct_total_sums += totals @ is_correct
+        upper_size += int(upper.sum())
+        lower_size += int(lower.sum())
+        for option in range(len(OPTIONS) + 1):
+            chosen = matrix == option
+            picks[option] += chosen.sum(axis=0)
+            upper_picks[option] += chosen[upper].sum(axis=0)
+            lower_picks[option] += chosen[lower].sum(axis=0)
+
+    if attempts:
+        p = correct_counts / attempts
+        mean = total_sum / attempts
+        sd = np.sqrt(max(total_sq_sum / attempts - mean * mean, 0.0))
+        item_sd = np.sqrt(p * (1 - p))
+        # Item-total point-biserial: (M1 - M0) / sd * sqrt(pq)
+        mean_correct = _ratio(correct_total_sums, correct_counts)
+        mean_wrong = _ratio(total_sum - correct_total_sums, attempts - correct_counts)
+        point_biserial = _ratio((mean_correct - mean_wrong) * item_sd, sd)
+        # Corrected (item-rest) correlation: the item's own point is removed from each total
+        rest_mean = mean - p
+        rest_var = (total_sq_sum - 2 * correct_total_sums + correct_counts) / attempts - rest_mean ** 2
+        covariance = (correct_total_sums - correct_counts) / attempts - p * rest_mean
+        corrected = _ratio(covariance, item_sd * np.sqrt(np.maximum(rest_var, 0.0)))
+        upper_p = _ratio(upper_picks[correct, np.arange(n_questions)], upper_size)
+        lower_p = _ratio(lower_picks[correct, np.arange(n_questions)], lower_size)
+    else:
+        p = point_biserial = corrected = upper_p = lower_p = np.full(n_questions, np.nan)
+
+    items = []
+    for column, (question_id, correct_option) in enumerate(key.items()):
+        distractors = []
+        for option in OPTIONS:
+            chosen = int(picks[option, column])
+            distractors.append({
+                'option': option,
+                'correct': option == correct_option,
+                'count': chosen,
+                'proportion': _round(chosen / attempts if attempts else np.nan),
+                'upper_count': int(upper_picks[option, column]),
+                'lower_count': int(lower_picks[option, column]),
+            })
+        items.append({
+            'question_id': question_id,
+            'correct_option': correct_option,
+            'difficulty': _round(p[column]),
+            'point_biserial': _round(point_biserial[column]),
+            'corrected_point_biserial': _round(corrected[column]),
+            'discrimination_index': _round(upper_p[column] - lower_p[column]),
+            'unanswered': int(picks[0, column]),
+            'distractors': distractors,
+        })
+    return {
+        'quiz_id': quiz.id,
+        'content_version': quiz.content_version,
+        'attempts': attempts,
+        'upper_group': {'min_score': upper_cutoff, 'size': upper_size},
+        'lower_group': {'max_score': lower_cutoff, 'size': lower_size},
+        'items': items,
+    }
+
+def init_item_analysis(app):
+    app.extensions['item_analysis'] = LRUCache(maxsize=app.config.get('ITEM_ANALYSIS_CACHE_SIZE', 128))
+
+def get_item_analysis(quiz_id, chunk_size=5000):
+    """Cached analysis; recomputed when the quiz content, attempt count, score total or a rebuild changes it."""
+    row = db.session.query(Quiz.content_version, QuizStats.scores_version, QuizStats.attempt_count,
+                           QuizStats.score_sum)\
+                    .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id)\
+                    .filter(Quiz.id == quiz_id).first()
+    if row is None:
+        raise ValueError(f"Quiz {quiz_id} not found")
+    quiz_version, scores_version, attempt_count, score_sum = row
+    stamp = (quiz_version, scores_version or 0, attempt_count or 0, score_sum or 0)
+    cache = current_app.extensions['item_analysis']
+    cached = cache.get(quiz_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    analysis = analyze_quiz(quiz_id, chunk_size=chunk_size)
+    cache.set(quiz_id, (stamp, analysis))
+    return analysis
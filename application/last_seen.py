@@ -0,0 +1,92 @@
+# Write-behind buffer for User.last_seen.
+# Requests only record a timestamp in memory; pending timestamps are written in one executemany
+# UPDATE when the batch fills up, every LAST_SEEN_FLUSH_INTERVAL seconds, and at shutdown.
+import atexit
+import threading
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from flask_login import current_user
+from sqlalchemy import bindparam
+from application.extensions import db
+
+class LastSeenBuffer:
+    def __init__(self, app, interval=60, batch_size=500):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending = {}  # user id -> latest timestamp
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def touch(self, user_id, when=None):
+        with self._lock:
+            self._pending[user_id] = when or datetime.now(timezone.utc)
+            full = len(self._pending) >= self.batch_size
+        self._ensure_timer()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all pending timestamps in one transaction; returns the number of users updated."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            users = db.metadata.tables['users']
+            statement = users.update()\
+                             .where(users.c.id == bindparam('user_id'))\
+                             .values(last_seen=bindparam('seen'))
+            rows = [{'user_id': user_id, 'seen': seen} for user_id, seen in pending.items()]
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    conn.execute(statement, rows)
+            except Exception:
+                # Keep the timestamps for the next attempt unless newer ones arrived meanwhile
+                with self._lock:
+                    for user_id, seen in pending.items():
+                        self._pending.setdefault(user_id, seen)
+                self.app.logger.exception("Flushing last_seen updates failed")
+                return 0
+            return len(rows)
+
+    def _ensure_timer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='last-seen-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+def init_last_seen(app):
+    buffer = LastSeenBuffer(
+        app,
+        interval=app.config.get('LAST_SEEN_FLUSH_INTERVAL', 60),
+        batch_size=app.config.get('LAST_SEEN_BATCH_SIZE', 500))
+    app.extensions['last_seen'] = buffer
+    atexit.register(buffer.close)
+
+    @app.before_request
+    def track_last_seen():
+        if current_user.is_authenticated:
+            buffer.touch(current_user.id)
+
+    return buffer
+
+def record_last_seen(user_id):
+    """Queue a last_seen update; returns False when no buffer is configured."""
+    buffer = current_app.extensions.get('last_seen') if has_app_context() else None
+    if buffer is None:
+        return False
+    buffer.touch(user_id)
+    return True
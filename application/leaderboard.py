@@ -0,0 +1,178 @@
+# Per-quiz leaderboards kept in memory and updated incrementally.
+# Attempts are ranked by total_scored (highest first), ties broken by earlier submission. A board
+# holds a Fenwick tree of counts per score plus a time-sorted bucket per score, so "your rank" is
+# O(log n) and the top-N list is cached until the board changes.
+#
+# Boards are per worker. Each lookup compares the board with a cheap stamp from the rollups
+# ((content_version, scores_version), attempt_count, score_sum); attempts stored by other workers
+# are appended incrementally, and anything else (regrades, deletions) triggers a rebuild.
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from flask import current_app
+from application.caching import LRUCache
+from application.db_routing import on_primary
+from application.extensions import db
+from application.models import Quiz, QuizStats, Score, User
+from application.quiz_content import single_flight
+
+class _Fenwick:
+    """Binary indexed tree of counts per score value."""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Number of entries with a score <= index."""
+        index = min(index, self.size - 1) + 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+def _sort_key(submitted_at, score_id):
+    # Naive timestamps throughout; missing ones sort first
+    if submitted_at is None:
+        return datetime.min, score_id
+    return submitted_at.replace(tzinfo=None), score_id
+
+class Leaderboard:
+    def __init__(self, quiz_id, version):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.count = 0
+        self.score_sum = 0
+        self.max_id = 0
+        self._buckets = {}  # total -> sorted [(submitted_at, score_id, user_id)]
+        self._counts = _Fenwick(1)
+        self._top = None
+        self._lock = threading.Lock()
+
+    @property
+    def stamp(self):
+        return self.version, self.count, self.score_sum
+
+    def _grow(self, total):
+        counts = _Fenwick(max(total + 1, self._counts.size * 2))
+        for score, bucket in self._buckets.items():
+            counts.add(score, len(bucket))
+        self._counts = counts
+
+    def _insert(self, score_id, user_id, total, submitted_at):
+        if total >= self._counts.size:
+            self._grow(total)
+        insort(self._buckets.setdefault(total, []), (*_sort_key(submitted_at, score_id), user_id))
+        self._counts.add(total, 1)
+        self.count += 1
+        self.score_sum += total
+        self.max_id = max(self.max_id, score_id)
+        self._top = None
+
+    def extend(self, rows):
+        """Add (score_id, user_id, total, submitted_at) rows newer than anything on the board."""
+        with self._lock:
+            for score_id, user_id, total, submitted_at in rows:
+                if score_id > self.max_id:
+                    self._insert(score_id, user_id, total, submitted_at)
+
+    def rank(self, total, submitted_at, score_id):
+        """1-based position of an attempt: higher scores first, then earlier submissions."""
+        with self._lock:
+            ahead = self.count - self._counts.prefix(total)
+            bucket = self._buckets.get(total, ())
+            return ahead + bisect_left(bucket, _sort_key(submitted_at, score_id)) + 1
+
+    def top(self, limit):
+        """[(rank, score_id, user_id, total, submitted_at)] for the best `limit` attempts."""
+        with self._lock:
+            if self._top is None or len(self._top) < min(limit, self.count):
+                entries = []
+                for total in sorted(self._buckets, reverse=True):
+                    for submitted_at, score_id, user_id in self._buckets[total]:
+                        if len(entries) >= limit:
+                            break
+                        entries.append((len(entries) + 1, score_id, user_id, total, submitted_at))
+                    if len(entries) >= limit:
+                        break
+                self._top = entries
+            return self._top[:limit]
+
+    def __len__(self):
+        return self.count
+
+def init_leaderboards(app):
+    app.extensions['leaderboards'] = LRUCache(maxsize=app.config.get('LEADERBOARD_CACHE_SIZE', 256))
+
+def score_rows_query(quiz_id, after_id=0):
+    """Query for the ranking columns of a quiz's attempts stored after after_id, in id order."""
+    return db.session.query(Score.id, Score.user_id, Score.total_scored, Score.time_stamp_of_attempt)\
+                     .filter(Score.quiz_id == quiz_id, Score.id > after_id)\
+                     .order_by(Score.id)
+
+def _stamp(quiz_id):
+    row = db.session.query(Quiz.content_version, QuizStats.scores_version, QuizStats.attempt_count,
+                           QuizStats.score_sum)\
+                    .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id)\
+                    .filter(Quiz.id == quiz_id).first()
+    if row is None:
+        return None
+    content_version, scores_version, attempts, score_sum = row
+    return (content_version, scores_version or 0), attempts or 0, score_sum or 0
+
+def build_leaderboard(quiz_id, version):
+    board = Leaderboard(quiz_id, version)
+    board.extend(score_rows_query(quiz_id).all())
+    return board
+
+def get_leaderboard(quiz_id):
+    """Current leaderboard for a quiz, or None if the quiz does not exist."""
+    # Boards are shared and updated in place, so they only ever see the primary
+    with on_primary():
+        stamp = _stamp(quiz_id)
+        if stamp is None:
+            return None
+        cache = current_app.extensions['leaderboards']
+        board = cache.get(quiz_id)
+        if board is not None and board.stamp != stamp and board.version == stamp[0] and board.count < stamp[1]:
+            # Attempts stored by other workers: append just the new rows
+            board.extend(score_rows_query(quiz_id, after_id=board.max_id).all())
+    if board is None or board.stamp != stamp:
+        board = single_flight(('leaderboard', quiz_id, stamp), lambda: build_leaderboard(quiz_id, stamp[0]))
+        cache.set(quiz_id, board)
+    return board
+
+def top_entries(board, limit):
+    """The board's top `limit` attempts as dicts, with usernames loaded in one query."""
+    top = board.top(max(limit, 1))
+    usernames = dict(db.session.query(User.id, User.username)
+                               .filter(User.id.in_({entry[2] for entry in top})).all()) if top else {}
+    return [{
+        'rank': rank,
+        'score_id': score_id,
+        'username': usernames.get(user_id),
+        'score': total,
+        'submitted_at': submitted_at
+    } for rank, score_id, user_id, total, submitted_at in top]
+
+def record_scores(rows):
+    """Apply committed (quiz_id, score_id, user_id, total, submitted_at) rows to boards held here."""
+    cache = current_app.extensions.get('leaderboards')
+    if cache is None:
+        return
+    for quiz_id, *entry in rows:
+        board = cache.get(quiz_id)
+        if board is not None:
+            board.extend([entry])
+
+def invalidate_leaderboard(quiz_id):
+    cache = current_app.extensions.get('leaderboards')
+    if cache is not None:
+        cache.pop(quiz_id)
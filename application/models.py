@@ -1,8 +1,11 @@
 from datetime import datetime, timezone, timedelta
-from flask import json
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from .extensions import db
+from .caching import after_commit, pending_commit
+from .answer_sheets import dump_json, is_packed, iter_codes, load_json, pack_answers, unpack_codes
 import pytz
 IST = pytz.timezone('Asia/Kolkata') # Indian Standard Time
 
@@ -51,8 +54,11 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
     def update_last_seen(self):
-        self.last_seen = datetime.now(timezone.utc)
-        db.session.commit()
+        """Queue a last_seen update on the write-behind buffer (commits directly without one)."""
+        from application.last_seen import record_last_seen
+        if not record_last_seen(self.id):
+            self.last_seen = datetime.now(timezone.utc)
+            db.session.commit()
 
 class Subject(db.Model):
     __tablename__ = 'subjects'
@@ -70,7 +76,7 @@ class Chapter(db.Model):
     description = db.Column(db.Text)
     
     # Relationships with Subject and Quiz models (one-to-many) 
-    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False, index=True)
     subject = db.relationship('Subject', back_populates='chapters')
     quizzes = db.relationship('Quiz', back_populates='chapter', cascade='all, delete-orphan')
 
@@ -78,29 +84,50 @@ class Quiz(db.Model):
     __tablename__ = 'quizzes'
     id = db.Column(db.Integer, primary_key=True)
     quiz_name = db.Column(db.String(100), nullable=False)
-    start_time = db.Column(db.DateTime, nullable=False) # Start time of quiz
+    start_time = db.Column(db.DateTime, nullable=False, index=True) # Start time of quiz
     end_time = db.Column(db.DateTime, nullable=True)    # End time of quiz
+    effective_end_time = db.Column(db.DateTime, index=True)  # end_time or start_time + duration, kept in sync on flush
     duration = db.Column(db.Integer, nullable=False)  # Minutes duration of quiz  
     remarks = db.Column(db.Text, nullable=True)
     active = db.Column(db.Boolean, default=True)
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # maintained by Question events
+    content_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bumped when displayed content changes
     
     # Relationships with Chapter, Question, Score, and QuizAttempt models (one-to-many) 
-    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id', ondelete='CASCADE'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id', ondelete='CASCADE'), nullable=False, index=True)
     chapter = db.relationship('Chapter', back_populates='quizzes')
     questions = db.relationship('Question', back_populates='quiz', cascade='all, delete-orphan')
     scores = db.relationship('Score', back_populates='quiz', cascade='all, delete-orphan')
     quiz_attempts = db.relationship('QuizAttempt', back_populates='quiz', cascade='all, delete-orphan')
+    stats = db.relationship('QuizStats', back_populates='quiz', uselist=False, cascade='all, delete-orphan')
+    score_histogram = db.relationship('ScoreHistogram', back_populates='quiz', cascade='all, delete-orphan')
     
+    def compute_end_time(self):
+        """End of the attempt window: explicit end_time or start_time + duration."""
+        if self.end_time:
+            return self.end_time
+        return self.start_time + timedelta(minutes=self.duration or 0)
+
+    @classmethod
+    def available(cls, now=None):
+        """Query for Active and Upcoming quizzes (range scan on effective_end_time)."""
+        now = now or datetime.now()
+        return cls.query.filter(cls.effective_end_time >= now).order_by(cls.start_time)
+
+    @classmethod
+    def opening_between(cls, since, until):
+        """Query for (id, start_time) of quizzes opening in (since, until] (range scan on start_time)."""
+        return db.session.query(cls.id, cls.start_time).filter(cls.start_time > since, cls.start_time <= until)
+
     @property
     def status(self):
-        """Determine the quiz status: Active, Upcoming, or Ended (in IST)."""
-        ist = pytz.timezone("Asia/Kolkata")  # Define IST timezone
-        now_ist = datetime.now(ist)  # Get current time in IST
-        start_time_ist = self.start_time.astimezone(ist)
-        end_time_ist = start_time_ist + timedelta(minutes=self.duration)
-        if now_ist < start_time_ist:
+        """Determine the quiz status: Active, Upcoming, or Ended."""
+        # start/end times are stored naive in server local time, as in attempt_quiz
+        now = datetime.now()
+        end_time = self.effective_end_time or self.compute_end_time()
+        if now < self.start_time:
             return "Upcoming"  # Current time is before the start time
-        elif start_time_ist <= now_ist <= end_time_ist:
+        elif now <= end_time:
             return "Active"  # Current time is within the quiz duration
         else:
             return "Ended"
@@ -108,6 +135,20 @@ class Quiz(db.Model):
     def __repr__(self):
         return f"<Quiz {self.id} - {self.quiz_name}>"
 
+@event.listens_for(Quiz, 'before_insert')
+@event.listens_for(Quiz, 'before_update')
+def _sync_effective_end_time(mapper, connection, target):
+    # Keep the indexed end time in step with start_time/duration/end_time edits
+    if target.start_time is not None:
+        target.effective_end_time = target.compute_end_time()
+
+@event.listens_for(Quiz, 'before_update')
+def _quiz_content_changed(mapper, connection, target):
+    # The attempt page shows the quiz name and remarks, so edits to them retire cached fragments
+    state = db.inspect(target)
+    if state.attrs.quiz_name.history.has_changes() or state.attrs.remarks.history.has_changes():
+        target.content_version = (target.content_version or 1) + 1
+
 class Question(db.Model):
     __tablename__ = 'questions'
     id = db.Column(db.Integer, primary_key=True)
@@ -119,8 +160,100 @@ class Question(db.Model):
     correct_option = db.Column(db.Integer, nullable=False)
     
     # Relationships with Quiz model (many-to-one) 
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False, index=True)
     quiz = db.relationship('Quiz', back_populates='questions')
+    stats = db.relationship('QuestionStats', back_populates='question', uselist=False, cascade='all, delete-orphan')
+
+    @classmethod
+    def for_quiz(cls, quiz_id):
+        """Query for the questions of a quiz in id order."""
+        return cls.query.filter_by(quiz_id=quiz_id).order_by(cls.id)
+
+@event.listens_for(Question, 'after_insert')
+def _question_added(mapper, connection, target):
+    quizzes = Quiz.__table__
+    connection.execute(quizzes.update()
+                       .where(quizzes.c.id == target.quiz_id)
+                       .values(question_count=quizzes.c.question_count + 1,
+                               content_version=quizzes.c.content_version + 1))
+
+@event.listens_for(Question, 'after_update')
+def _question_changed(mapper, connection, target):
+    quizzes = Quiz.__table__
+    connection.execute(quizzes.update()
+                       .where(quizzes.c.id == target.quiz_id)
+                       .values(content_version=quizzes.c.content_version + 1))
+
+@event.listens_for(Question, 'after_delete')
+def _question_removed(mapper, connection, target):
+    quizzes = Quiz.__table__
+    connection.execute(quizzes.update()
+                       .where(quizzes.c.id == target.quiz_id)
+                       .values(question_count=quizzes.c.question_count - 1,
+                               content_version=quizzes.c.content_version + 1))
+
+class AnswerLayout(db.Model):
+    """Question order a packed answer sheet is indexed by; rows are immutable once written."""
+    __tablename__ = 'answer_layouts'
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False)
+    question_ids = db.Column(db.Text, nullable=False)  # comma-separated, in answer-key order
+
+    __table_args__ = (
+        db.UniqueConstraint('quiz_id', 'question_ids', name='uq_answer_layout'),
+    )
+
+    # Process-wide lookups of committed layouts; safe to keep forever because layouts never change
+    _orders = {}      # layout id -> tuple of question ids
+    _layout_ids = {}  # (quiz id, tuple of question ids) -> layout id
+
+    @classmethod
+    def lookup(cls, quiz_id, question_ids_text):
+        """Query for the id of a stored layout (served by the unique index)."""
+        return db.session.query(cls.id).filter_by(quiz_id=quiz_id, question_ids=question_ids_text)
+
+    @classmethod
+    def id_for(cls, quiz_id, question_ids):
+        """Id of the layout for this question order, adding it to the session if it is new."""
+        order = tuple(question_ids)
+        layout_id = cls._layout_ids.get((quiz_id, order))
+        if layout_id is not None:
+            return layout_id
+        text = ','.join(map(str, order))
+        layout_id = cls.lookup(quiz_id, text).scalar()
+        if layout_id is None:
+            layout = cls(quiz_id=quiz_id, question_ids=text)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(layout)
+            except IntegrityError:
+                # A concurrent writer stored the same layout first
+                layout_id = cls.lookup(quiz_id, text).scalar()
+            else:
+                # Remembered only once committed, so a rolled-back layout id is never cached
+                layout_id = layout.id
+                after_commit(db.session, ('answer_layout', layout_id), lambda: cls._remember(layout_id, quiz_id, order))
+                return layout_id
+        if not pending_commit(db.session, ('answer_layout', layout_id)):
+            cls._remember(layout_id, quiz_id, order)
+        return layout_id
+
+    @classmethod
+    def order_for(cls, layout_id):
+        order = cls._orders.get(layout_id)
+        if order is None:
+            row = db.session.query(cls.quiz_id, cls.question_ids).filter_by(id=layout_id).first()
+            if row is None:
+                return ()
+            order = tuple(int(question_id) for question_id in row.question_ids.split(',') if question_id)
+            if not pending_commit(db.session, ('answer_layout', layout_id)):
+                cls._remember(layout_id, row.quiz_id, order)
+        return order
+
+    @classmethod
+    def _remember(cls, layout_id, quiz_id, order):
+        cls._layout_ids[(quiz_id, order)] = layout_id
+        cls._orders[layout_id] = order
 
 class Score(db.Model):
     __tablename__ = 'scores'
@@ -134,26 +267,98 @@ class Score(db.Model):
     quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False)
     quiz = db.relationship('Quiz', back_populates='scores')
     
-    answers_raw = db.Column('answers', db.Text, nullable=True)
+    # Packed answer sheet (see application.answer_sheets) or legacy JSON
+    answers_raw = db.Column('answers', db.LargeBinary, nullable=True)
     
     @property
     def answers(self):
-        """Return the answers as a dictionary."""
-        if self.answers_raw:
-            try:
-                return json.loads(self.answers_raw)
-            except Exception:
-                return {}
-        return {}
+        """Return the answers as {question_id: option}, decoded once per stored value."""
+        raw = self.answers_raw
+        memo = getattr(self, '_answers_memo', None)
+        if memo is not None and memo[0] is raw:
+            return memo[1]
+        answers = self.decode_answers(raw)
+        self._answers_memo = (raw, answers)
+        return answers
 
     @answers.setter
     def answers(self, value):
-        """Serialize the dictionary to a JSON string."""
-        self.answers_raw = json.dumps(value)
+        self.set_answers(value)
+
+    def set_answers(self, answers, layout_id=None, question_ids=()):
+        """Store a sheet packed against a layout when possible, otherwise as JSON."""
+        self.answers_raw = self.encode_answers(answers, layout_id, question_ids)
+
+    @staticmethod
+    def encode_answers(answers, layout_id=None, question_ids=()):
+        """Stored value for {question_id: option}: packed against the layout, or JSON without one."""
+        answers = answers or {}
+        packed = pack_answers(answers, layout_id, question_ids) if layout_id is not None else None
+        return packed or dump_json(answers)
+
+    @staticmethod
+    def decode_answers(raw):
+        """Parse a stored answers value (packed or legacy JSON) into {question_id: option}."""
+        if not raw:
+            return {}
+        if is_packed(raw):
+            layout_id, codes = unpack_codes(raw)
+            order = AnswerLayout.order_for(layout_id)
+            return {order[position]: option for position, option in iter_codes(codes, len(order))}
+        return load_json(raw)
+
+    @classmethod
+    def history(cls, user_id, newest_first=True):
+        """Query for a user's attempts by time (served by idx_score_user_time)."""
+        order = cls.time_stamp_of_attempt.desc() if newest_first else cls.time_stamp_of_attempt.asc()
+        return cls.query.filter_by(user_id=user_id).order_by(order)
+
+    @classmethod
+    def latest(cls, quiz_id, user_id):
+        """Query for a user's attempts at a quiz, newest first (served by uq_score_user_quiz)."""
+        return cls.query.filter_by(quiz_id=quiz_id, user_id=user_id).order_by(cls.time_stamp_of_attempt.desc())
+
+    @classmethod
+    def subject_averages(cls, user_id):
+        """Query for (subject_id, average score) over a user's attempts."""
+        return db.session.query(Chapter.subject_id, db.func.avg(cls.total_scored))\
+                         .select_from(cls)\
+                         .join(Quiz, cls.quiz_id == Quiz.id)\
+                         .join(Chapter, Quiz.chapter_id == Chapter.id)\
+                         .filter(cls.user_id == user_id)\
+                         .group_by(Chapter.subject_id)
+
+    @classmethod
+    def best_per_subject(cls, user_id):
+        """Query for (subject_name, quiz_name, total_scored) of a user's best attempt in each subject.
+
+        The earliest attempt wins ties, and subjects come in order of the user's first attempt.
+        """
+        ranked = db.session.query(
+            Subject.name.label('subject_name'),
+            Quiz.quiz_name.label('quiz_name'),
+            cls.total_scored.label('total_scored'),
+            db.func.row_number().over(
+                partition_by=Subject.id,
+                order_by=(cls.total_scored.desc(), cls.time_stamp_of_attempt.asc(), cls.id.asc())
+            ).label('rank'),
+            db.func.min(cls.time_stamp_of_attempt).over(partition_by=Subject.id).label('first_attempt'))\
+            .select_from(cls)\
+            .join(Quiz, cls.quiz_id == Quiz.id)\
+            .join(Chapter, Quiz.chapter_id == Chapter.id)\
+            .join(Subject, Chapter.subject_id == Subject.id)\
+            .filter(cls.user_id == user_id)\
+            .subquery()
+        return db.session.query(ranked.c.subject_name, ranked.c.quiz_name, ranked.c.total_scored)\
+                         .filter(ranked.c.rank == 1)\
+                         .order_by(ranked.c.first_attempt)
     
     # Composite index for common queries on user and quiz 
     __table_args__ = (
-        db.Index('idx_user_quiz', 'user_id', 'quiz_id'),
+        db.Index('uq_score_user_quiz', 'user_id', 'quiz_id', unique=True),  # one attempt per user and quiz
+        db.Index('idx_score_time_id', 'time_stamp_of_attempt', 'id'),  # keyset pagination of attempts
+        db.Index('idx_score_quiz_time', 'quiz_id', 'time_stamp_of_attempt'),
+        db.Index('idx_score_user_time', 'user_id', 'time_stamp_of_attempt'),  # a user's history, newest first
     )
 
 class QuizAttempt(db.Model):
@@ -166,3 +371,321 @@ class QuizAttempt(db.Model):
     # Relationships with User and Quiz models (many-to-one)
     user = db.relationship('User', back_populates='quiz_attempts')
     quiz = db.relationship('Quiz', back_populates='quiz_attempts')
+
+
+class QuizStats(db.Model):
+    """Per-quiz rollup of submitted scores, updated with every Score insert."""
+    __tablename__ = 'quiz_stats'
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_sq_sum = db.Column(db.Integer, nullable=False, default=0)
+    min_score = db.Column(db.Integer)
+    max_score = db.Column(db.Integer)
+    scores_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped by rebuild
+
+    quiz = db.relationship('Quiz', back_populates='stats')
+
+    @property
+    def average(self):
+        return self.score_sum / self.attempt_count if self.attempt_count else 0
+
+    @property
+    def std_dev(self):
+        if not self.attempt_count:
+            return 0
+        variance = self.score_sq_sum / self.attempt_count - self.average ** 2
+        return max(variance, 0) ** 0.5
+
+    @classmethod
+    def record(cls, quiz_id, total_scored):
+        """Fold one new score into the rollup inside the caller's transaction."""
+        cls.record_many(quiz_id, [total_scored])
+
+    @classmethod
+    def record_many(cls, quiz_id, totals):
+        """Fold a batch of new scores for one quiz into the rollup with a single UPDATE."""
+        if not totals:
+            return
+        count, total, sq_total = len(totals), sum(totals), sum(t * t for t in totals)
+        low, high = min(totals), max(totals)
+        updated = cls.query.filter_by(quiz_id=quiz_id).update({
+            cls.attempt_count: cls.attempt_count + count,
+            cls.score_sum: cls.score_sum + total,
+            cls.score_sq_sum: cls.score_sq_sum + sq_total,
+            cls.min_score: db.case((cls.min_score <= low, cls.min_score), else_=low),
+            cls.max_score: db.case((cls.max_score >= high, cls.max_score), else_=high),
+        }, synchronize_session=False)
+        if not updated:
+            db.session.add(cls(
+                quiz_id=quiz_id,
+                attempt_count=count,
+                score_sum=total,
+                score_sq_sum=sq_total,
+                min_score=low,
+                max_score=high))
+
+    @classmethod
+    def rebuild(cls, quiz_ids=None):
+        """Recompute rollups from the scores table (all quizzes or the given ids).
+
+        Rebuilds follow changes to stored totals (regrades, deletions), so each one bumps
+        scores_version and caches stamped with it (leaderboards, item analysis) reload.
+        """
+        query = db.session.query(
+            Score.quiz_id,
+            db.func.count(Score.id),
+            db.func.sum(Score.total_scored),
+            db.func.sum(Score.total_scored * Score.total_scored),
+            db.func.min(Score.total_scored),
+            db.func.max(Score.total_scored)).group_by(Score.quiz_id)
+        existing = cls.query
+        if quiz_ids is not None:
+            query = query.filter(Score.quiz_id.in_(quiz_ids))
+            existing = existing.filter(cls.quiz_id.in_(quiz_ids))
+        versions = dict(existing.with_entities(cls.quiz_id, cls.scores_version))
+        existing.delete(synchronize_session=False)
+
+        rows = [{
+            'quiz_id': quiz_id,
+            'attempt_count': count,
+            'score_sum': total,
+            'score_sq_sum': sq_total,
+            'min_score': low,
+            'max_score': high,
+            'scores_version': versions.get(quiz_id, 0) + 1,
+        } for quiz_id, count, total, sq_total, low, high in query]
+        if rows:
+            db.session.execute(db.insert(cls), rows)
+        return len(rows)
+
+
+class ScoreDistribution:
+    """Scores of a quiz as counts per possible total; every statistic is a scan of the counts."""
+
+    def __init__(self, counts):
+        self.counts = counts  # counts[total] = attempts that scored total
+        self.attempts = sum(counts)
+
+    def _nth(self, k):
+        # Score of the k-th attempt (0-based) in ascending order
+        seen = 0
+        for total, count in enumerate(self.counts):
+            seen += count
+            if seen > k:
+                return total
+        return None
+
+    def quantile(self, fraction):
+        """Score at the given fraction of attempts, interpolating between neighbours."""
+        if not self.attempts:
+            return None
+        position = fraction * (self.attempts - 1)
+        low = int(position)
+        low_score = self._nth(low)
+        if position == low:
+            return low_score
+        return low_score + (self._nth(low + 1) - low_score) * (position - low)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def percentile(self, total):
+        """Percentile rank of a score: attempts below it plus half of the ties, as a percentage."""
+        if not self.attempts:
+            return None
+        total = min(max(total, 0), len(self.counts) - 1)
+        below = sum(self.counts[:total])
+        return round((below + self.counts[total] / 2) / self.attempts * 100, 1)
+
+
+class ScoreHistogram(db.Model):
+    """Per-quiz count of attempts for each total score, updated with every Score insert."""
+    __tablename__ = 'score_histograms'
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    quiz = db.relationship('Quiz', back_populates='score_histogram')
+
+    @classmethod
+    def record_many(cls, quiz_id, totals):
+        """Fold a batch of new scores for one quiz into its histogram with a single UPDATE."""
+        if not totals:
+            return
+        deltas = {}
+        for total in totals:
+            deltas[total] = deltas.get(total, 0) + 1
+        updated = cls.query.filter(cls.quiz_id == quiz_id, cls.score.in_(deltas))\
+                           .update({cls.count: cls.count + db.case(deltas, value=cls.score, else_=0)},
+                                   synchronize_session=False)
+        if updated == len(deltas):
+            return
+
+        # First attempts with some of these scores: create their buckets
+        existing = {score for (score,) in db.session.query(cls.score)
+                                                    .filter(cls.quiz_id == quiz_id, cls.score.in_(deltas))}
+        for score, count in deltas.items():
+            if score not in existing:
+                db.session.add(cls(quiz_id=quiz_id, score=score, count=count))
+
+    @classmethod
+    def rebuild(cls, quiz_ids=None):
+        """Recompute histograms from the scores table (all quizzes or the given ids)."""
+        query = db.session.query(Score.quiz_id, Score.total_scored, db.func.count(Score.id))\
+                          .group_by(Score.quiz_id, Score.total_scored)
+        existing = cls.query
+        if quiz_ids is not None:
+            query = query.filter(Score.quiz_id.in_(quiz_ids))
+            existing = existing.filter(cls.quiz_id.in_(quiz_ids))
+        existing.delete(synchronize_session=False)
+
+        rows = [{'quiz_id': quiz_id, 'score': score, 'count': count} for quiz_id, score, count in query]
+        if rows:
+            db.session.execute(db.insert(cls), rows)
+        return len(rows)
+
+    @classmethod
+    def buckets(cls, quiz_ids):
+        """Query for the non-empty (quiz_id, score, count) buckets of the given quizzes."""
+        return db.session.query(cls.quiz_id, cls.score, cls.count).filter(cls.quiz_id.in_(quiz_ids), cls.count > 0)
+
+    @classmethod
+    def distributions(cls, quiz_ids):
+        """{quiz_id: ScoreDistribution} covering 0..question_count for each quiz, in one query."""
+        sizes = dict(db.session.query(Quiz.id, Quiz.question_count).filter(Quiz.id.in_(quiz_ids)))
+        buckets = {quiz_id: {} for quiz_id in sizes}
+        for quiz_id, score, count in cls.buckets(sizes):
+            buckets[quiz_id][max(score, 0)] = count
+        result = {}
+        for quiz_id, per_score in buckets.items():
+            size = max(sizes[quiz_id] or 0, max(per_score, default=0)) + 1
+            result[quiz_id] = ScoreDistribution([per_score.get(score, 0) for score in range(size)])
+        return result
+
+    @classmethod
+    def distribution(cls, quiz_id):
+        """ScoreDistribution of one quiz, or None if the quiz does not exist."""
+        return cls.distributions([quiz_id]).get(quiz_id)
+
+
+class QuestionStats(db.Model):
+    """Per-question answer counters, updated with every Score insert."""
+    __tablename__ = 'question_stats'
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)  # submissions that included the question
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    option1_count = db.Column(db.Integer, nullable=False, default=0)
+    option2_count = db.Column(db.Integer, nullable=False, default=0)
+    option3_count = db.Column(db.Integer, nullable=False, default=0)
+    option4_count = db.Column(db.Integer, nullable=False, default=0)
+
+    question = db.relationship('Question', back_populates='stats')
+
+    OPTIONS = (1, 2, 3, 4)
+
+    @property
+    def option_counts(self):
+        return {option: getattr(self, f'option{option}_count') for option in self.OPTIONS}
+
+    @property
+    def correct_percentage(self):
+        return round(self.correct_count / self.attempt_count * 100, 1) if self.attempt_count else 0
+
+    @classmethod
+    def for_quiz(cls, quiz_id):
+        """Query for (question_id, QuestionStats or None) of a quiz's questions in id order."""
+        return db.session.query(Question.id, cls)\
+                         .outerjoin(cls, cls.question_id == Question.id)\
+                         .filter(Question.quiz_id == quiz_id)\
+                         .order_by(Question.id)
+
+    @classmethod
+    def record(cls, questions, answers):
+        """Fold one submission (question_id -> chosen option) into the counters."""
+        cls.record_many([(q.id, q.correct_option) for q in questions], [answers])
+
+    @classmethod
+    def record_many(cls, answer_key, answer_sheets):
+        """Fold a batch of submissions for one quiz into the counters with a single UPDATE.
+
+        answer_key is a list of (question_id, correct_option); each sheet maps question_id -> option.
+        """
+        question_ids = [question_id for question_id, _ in answer_key]
+        if not question_ids or not answer_sheets:
+            return
+        attempts = len(answer_sheets)
+        deltas = {'correct_count': {}}
+        for option in cls.OPTIONS:
+            deltas[f'option{option}_count'] = {}
+        for answers in answer_sheets:
+            for question_id, correct_option in answer_key:
+                choice = answers.get(question_id)
+                if choice is None:
+                    continue
+                if choice == correct_option:
+                    deltas['correct_count'][question_id] = deltas['correct_count'].get(question_id, 0) + 1
+                if choice in cls.OPTIONS:
+                    picks = deltas[f'option{choice}_count']
+                    picks[question_id] = picks.get(question_id, 0) + 1
+
+        values = {cls.attempt_count: cls.attempt_count + attempts}
+        for name, per_question in deltas.items():
+            if per_question:
+                column = getattr(cls, name)
+                values[column] = column + db.case(per_question, value=cls.question_id, else_=0)
+
+        updated = cls.query.filter(cls.question_id.in_(question_ids))\
+                           .update(values, synchronize_session=False)
+        if updated == len(question_ids):
+            return
+
+        # First submissions for some questions: create their counter rows
+        existing = {qid for (qid,) in db.session.query(cls.question_id).filter(cls.question_id.in_(question_ids))}
+        for question_id in question_ids:
+            if question_id in existing:
+                continue
+            row = cls(question_id=question_id, attempt_count=attempts)
+            for name, per_question in deltas.items():
+                setattr(row, name, per_question.get(question_id, 0))
+            db.session.add(row)
+
+    @classmethod
+    def rebuild(cls, quiz_ids=None, batch_size=1000):
+        """Recompute counters by parsing stored answers in batches."""
+        question_query = db.session.query(Question.id, Question.quiz_id, Question.correct_option)
+        if quiz_ids is not None:
+            question_query = question_query.filter(Question.quiz_id.in_(quiz_ids))
+
+        counters = {}
+        quiz_questions = {}
+        for question_id, quiz_id, correct_option in question_query:
+            counters[question_id] = {
+                'question_id': question_id, 'attempt_count': 0, 'correct_count': 0,
+                'option1_count': 0, 'option2_count': 0, 'option3_count': 0, 'option4_count': 0}
+            quiz_questions.setdefault(quiz_id, []).append((question_id, correct_option))
+
+        score_query = db.session.query(Score.quiz_id, Score.answers_raw)\
+                                .execution_options(yield_per=batch_size)
+        existing = cls.query
+        if quiz_ids is not None:
+            score_query = score_query.filter(Score.quiz_id.in_(quiz_ids))
+            existing = existing.filter(cls.question_id.in_(
+                db.select(Question.id).where(Question.quiz_id.in_(quiz_ids))))
+        for quiz_id, answers_raw in score_query:
+            answers = Score.decode_answers(answers_raw)
+            for question_id, correct_option in quiz_questions.get(quiz_id, ()):
+                counter = counters[question_id]
+                counter['attempt_count'] += 1
+                choice = answers.get(question_id)
+                if choice == correct_option:
+                    counter['correct_count'] += 1
+                if choice in cls.OPTIONS:
+                    counter[f'option{choice}_count'] += 1
+
+        existing.delete(synchronize_session=False)
+        rows = list(counters.values())
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(db.insert(cls), rows[start:start + batch_size])
+        return len(rows)
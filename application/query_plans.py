@@ -0,0 +1,86 @@
+# Query-plan audit for the hot queries behind the blueprints.
+# Every entry is built by the same function the view or service calls, so the audit cannot drift
+# from the SQL that is actually issued. check_query_plans() runs EXPLAIN QUERY PLAN for all of
+# them against the connected SQLite database and reports any that read a table with a full scan
+# instead of an index, so a dropped or mis-ordered index is caught before it reaches production
+# (tests/test_query_plans.py runs it against a migrated database; 'flask check-query-plans'
+# runs it against the configured one).
+# Whole-table reads are left out on purpose: stats.quiz_analytics and the content tree snapshot
+# load every quiz, so a scan is the right plan for them.
+import re
+from datetime import datetime, timedelta
+from sqlalchemy.orm import with_parent
+from application.extensions import db
+from application.models import AnswerLayout, Chapter, Question, QuestionStats, Quiz, Score, ScoreHistogram, Subject, \
+    User
+from application.read_models import attempts_query, questions_query, scores_query, users_query
+from application.leaderboard import score_rows_query
+
+_NOW = datetime(2026, 1, 1)
+
+def hot_queries(user_id=1, quiz_id=1, subject_id=1, chapter_id=1, now=_NOW):
+    """{name: query} of the hot paths, built with sample ids."""
+    cursor = f'{now.isoformat()}_100'
+    return {
+        # user.dashboard (read model) and attempt_history / scores / summary / stats.user_performance
+        'user attempts by time': scores_query(user_id),
+        'user attempts by time (entities)': Score.history(user_id),
+        'user attempts oldest first': Score.history(user_id, newest_first=False),
+        # user.results / attempt_quiz, stats.leaderboard / score_distribution, duplicate submissions
+        'latest attempt of user on quiz': Score.latest(quiz_id, user_id).limit(1),
+        # user.summary charts
+        'subject averages of user': Score.subject_averages(user_id),
+        'best attempt per subject of user': Score.best_per_subject(user_id),
+        # admin.view_all_attempts: unfiltered and filtered first pages, and a later page
+        'attempts page': attempts_query({}).limit(51),
+        'attempts page after cursor': attempts_query({}, before=cursor).limit(51),
+        'attempts of quiz page': attempts_query({'quiz_id': quiz_id}, before=cursor).limit(51),
+        'attempts of user page': attempts_query({'user_id': user_id}).limit(51),
+        # admin.manage_users
+        'users by username': users_query(),
+        # leaderboard build and catch-up after attempts stored by other workers
+        'attempts of quiz after id': score_rows_query(quiz_id, after_id=100),
+        # fragments, answer keys, admin.manage_questions
+        'questions of quiz': Question.for_quiz(quiz_id),
+        'question rows of quiz': questions_query(quiz_id, with_text=True),
+        # stats.question_stats
+        'question counters of quiz': QuestionStats.for_quiz(quiz_id),
+        # score histograms (results percentile, stats.score_distribution)
+        'score histogram of quiz': ScoreHistogram.buckets([quiz_id]),
+        # answer layout lookup when packing a submission
+        'answer layout lookup': AnswerLayout.lookup(quiz_id, '1,2,3'),
+        # user.dashboard (ids mapped onto the content tree) and the warming range scan
+        'available quizzes': Quiz.available(now).with_entities(Quiz.id),
+        'quizzes opening soon': Quiz.opening_between(now, now + timedelta(hours=1)),
+        # ORM relationships walked by admin edits and cascading deletes
+        'quizzes of chapter': Quiz.query.filter(with_parent(Chapter(id=chapter_id), Chapter.quizzes)),
+        'chapters of subject': Chapter.query.filter(with_parent(Subject(id=subject_id), Subject.chapters)),
+        'questions of quiz (relationship)': Question.query.filter(with_parent(Quiz(id=quiz_id), Quiz.questions)),
+        'attempts of quiz (relationship)': Score.query.filter(with_parent(Quiz(id=quiz_id), Quiz.scores)),
+        'attempts of user (relationship)': Score.query.filter(with_parent(User(id=user_id), User.scores)),
+    }
+
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?!\w| USING)')
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\w+)')
+
+def explain(query):
+    """EXPLAIN QUERY PLAN detail lines for a query or statement on the current SQLite engine."""
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(db.engine, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[-1] for row in rows]
+
+def full_scans(plan):
+    """Tables read with a full scan in EXPLAIN QUERY PLAN detail lines (subquery results excluded)."""
+    subqueries = {match.group(1) for match in map(_SUBQUERY.match, plan) if match}
+    return [match.group(1) for match in map(_FULL_SCAN.match, plan) if match and match.group(1) not in subqueries]
+
+def check_query_plans(queries=None):
+    """[(name, plan lines, fully scanned tables)] for every hot query."""
+    results = []
+    for name, query in (queries or hot_queries()).items():
+        plan = explain(query)
+        results.append((name, plan, full_scans(plan)))
+    return results
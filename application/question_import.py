@@ -0,0 +1,105 @@
+# Bulk question import from CSV or JSON Lines.
+# Rows are streamed, validated with the same QuestionForm rules as the admin modal and
+# inserted in executemany batches inside a single transaction.
+import csv
+import json
+from werkzeug.datastructures import MultiDict
+from application.extensions import db
+from application.forms import QuestionForm
+from application.models import Quiz, Question
+from application.answer_keys import invalidate_answer_key
+from application.fragments import invalidate_quiz_fragments
+from application.quiz_content import invalidate_quiz_content
+
+QUESTION_FIELDS = ('question_statement', 'option1', 'option2', 'option3', 'option4', 'correct_option')
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []  # (row number, {field: [messages]})
+
+    def add_error(self, row_number, errors):
+        self.errors.append((row_number, errors))
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+def _iter_rows(stream, fmt):
+    # Yield (row number, dict | None, parse error) without loading the whole file
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, row, None
+
+def _validate(row):
+    formdata = MultiDict({
+        field: '' if row.get(field) is None else str(row.get(field)).strip()
+        for field in QUESTION_FIELDS
+    })
+    form = QuestionForm(formdata=formdata, meta={'csrf': False})
+    if not form.validate():
+        return None, form.errors
+    return {
+        'question_statement': form.question_statement.data,
+        'option1': form.option1.data,
+        'option2': form.option2.data,
+        'option3': form.option3.data or None,
+        'option4': form.option4.data or None,
+        'correct_option': form.correct_option.data,
+    }, None
+
+def import_questions(quiz, stream, fmt='csv', batch_size=500):
+    """Validate and insert questions for `quiz` from a text stream; bad rows are reported, not fatal."""
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        if batch:
+            db.session.execute(db.insert(Question), batch)
+            result.inserted += len(batch)
+            batch.clear()
+
+    try:
+        for row_number, row, parse_error in _iter_rows(stream, fmt):
+            if parse_error:
+                result.add_error(row_number, {'row': [parse_error]})
+                continue
+            values, errors = _validate(row)
+            if errors:
+                result.add_error(row_number, errors)
+                continue
+            values['quiz_id'] = quiz.id
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+        # Core inserts bypass the Question events that maintain question_count and content_version
+        if result.inserted:
+            quizzes = Quiz.__table__
+            db.session.execute(quizzes.update()
+                               .where(quizzes.c.id == quiz.id)
+                               .values(question_count=quizzes.c.question_count + result.inserted,
+                                       content_version=quizzes.c.content_version + 1))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if result.inserted:
+        invalidate_answer_key(quiz.id)
+        invalidate_quiz_fragments(quiz.id)
+        invalidate_quiz_content(quiz.id)
+    return result
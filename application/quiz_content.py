@@ -0,0 +1,87 @@
+# Shared, read-only quiz content for the attempt page.
+# Quiz rows are served from a short-TTL snapshot cache; cache misses for the same quiz (e.g. the
+# burst of students arriving at start_time) are coalesced through a SingleFlight so one request
+# loads while the others wait for its result.
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from application.caching import LRUCache, SingleFlight, invalidate_after_commit
+from application.db_routing import on_primary
+from application.extensions import db
+from application.models import Quiz, Question
+
+CONTENT_FIELDS = ('id', 'quiz_name', 'remarks', 'chapter_id', 'start_time', 'end_time', 'duration',
+                  'effective_end_time', 'question_count', 'content_version')
+
+class QuizContent:
+    """Read-only snapshot of the Quiz columns the attempt page needs."""
+    __slots__ = CONTENT_FIELDS
+
+    def __init__(self, **fields):
+        for name in CONTENT_FIELDS:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuizContent is read-only; load the Quiz model to make changes")
+
+    compute_end_time = Quiz.compute_end_time
+
+    def __repr__(self):
+        return f"<QuizContent {self.id} - {self.quiz_name}>"
+
+def init_quiz_content(app):
+    app.extensions['quiz_content'] = LRUCache(
+        maxsize=app.config.get('QUIZ_CONTENT_CACHE_SIZE', 1024),
+        ttl=app.config.get('QUIZ_CONTENT_TTL', 5))
+    app.extensions['singleflight'] = SingleFlight(timeout=app.config.get('SINGLE_FLIGHT_TIMEOUT', 10))
+
+def single_flight(key, load):
+    """Run `load` once for concurrent callers with the same key (directly if not configured).
+
+    Loads seed shared caches, so they always read from the primary database.
+    """
+    def load_from_primary():
+        with on_primary():
+            return load()
+
+    flights = current_app.extensions.get('singleflight') if has_app_context() else None
+    if flights is None:
+        return load_from_primary()
+    return flights.do(key, load_from_primary)
+
+def _load(quiz_id):
+    columns = [getattr(Quiz, name) for name in CONTENT_FIELDS]
+    row = db.session.query(*columns).filter(Quiz.id == quiz_id).first()
+    return QuizContent(**row._asdict()) if row is not None else None
+
+def get_quiz_content(quiz_id, fresh=False):
+    """Snapshot of a quiz, or None if it does not exist; `fresh` skips the cached copy."""
+    cache = current_app.extensions['quiz_content']
+    content = None if fresh else cache.get(quiz_id)
+    if content is None:
+        content = single_flight(('quiz', quiz_id), lambda: _load(quiz_id))
+        if content is not None:
+            cache.set(quiz_id, content)
+    return content
+
+def invalidate_quiz_content(quiz_id):
+    cache = current_app.extensions.get('quiz_content') if has_app_context() else None
+    if cache is not None:
+        cache.pop(quiz_id)
+
+# --- Invalidation through model events ---
+
+def _mark_stale(session, quiz_id):
+    invalidate_after_commit(session, ('quiz_content', quiz_id), lambda: invalidate_quiz_content(quiz_id))
+
+@event.listens_for(Quiz, 'after_update')
+@event.listens_for(Quiz, 'after_delete')
+def _quiz_changed(mapper, connection, target):
+    _mark_stale(object_session(target), target.id)
+
+@event.listens_for(Question, 'after_insert')
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+def _question_changed(mapper, connection, target):
+    # Question events bump the quiz's question_count/content_version
+    _mark_stale(object_session(target), target.quiz_id)
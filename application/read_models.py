@@ -0,0 +1,83 @@
+# Column-projected read models for listing pages.
+# Listings render a handful of columns per row, so instead of full ORM entities (every column,
+# identity-map bookkeeping, lazy relationships) they get plain namedtuple rows. Large text
+# columns are deferred: they are left as None unless the caller asks for them with with_text.
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+from application.extensions import db
+from application.models import User, Question, Score
+
+class ReadModel:
+    """Namedtuple rows over selected columns of a model."""
+
+    def __init__(self, name, model, fields, text_fields=()):
+        self.model = model
+        self.fields = fields
+        self.text_fields = text_fields
+        self.row = namedtuple(name, fields + text_fields)
+
+    def query(self, with_text=False):
+        text_columns = [getattr(self.model, name) if with_text else db.null().label(name)
+                        for name in self.text_fields]
+        return db.session.query(*(getattr(self.model, name) for name in self.fields), *text_columns)
+
+    def rows(self, query):
+        return [self.row._make(row) for row in query]
+
+USER_ROWS = ReadModel(
+    'UserRow', User,
+    ('id', 'username', 'full_name', 'email', 'dob', 'location', 'website', 'avatar', 'is_admin'),
+    text_fields=('bio',))
+
+QUESTION_ROWS = ReadModel(
+    'QuestionRow', Question,
+    ('id', 'quiz_id', 'option1', 'option2', 'option3', 'option4', 'correct_option'),
+    text_fields=('question_statement',))
+
+SCORE_ROWS = ReadModel(
+    'ScoreRow', Score,
+    ('id', 'quiz_id', 'user_id', 'total_scored', 'time_stamp_of_attempt'))  # the answer sheet stays in the table
+
+def users_query(with_text=False):
+    return USER_ROWS.query(with_text).order_by(User.username)
+
+def questions_query(quiz_id, with_text=False):
+    return QUESTION_ROWS.query(with_text).filter(Question.quiz_id == quiz_id).order_by(Question.id)
+
+def scores_query(user_id, newest_first=True):
+    order = Score.time_stamp_of_attempt.desc() if newest_first else Score.time_stamp_of_attempt.asc()
+    return SCORE_ROWS.query().filter(Score.user_id == user_id).order_by(order)
+
+def user_rows(with_text=False):
+    """All users ordered by username."""
+    return USER_ROWS.rows(users_query(with_text))
+
+def question_rows(quiz_id, with_text=False):
+    """Questions of a quiz in id order."""
+    return QUESTION_ROWS.rows(questions_query(quiz_id, with_text))
+
+def score_rows(user_id, newest_first=True):
+    """A user's attempts by submission time."""
+    return SCORE_ROWS.rows(scores_query(user_id, newest_first))
+
+def attempts_query(filters, before=None):
+    """Attempts matching the filters, newest first by (time_stamp_of_attempt, id).
+
+    `before` is a "<isoformat>_<id>" keyset cursor; malformed dates or cursors raise ValueError.
+    """
+    query = Score.query.options(joinedload(Score.user), joinedload(Score.quiz))
+    if filters.get('quiz_id'):
+        query = query.filter(Score.quiz_id == filters['quiz_id'])
+    if filters.get('user_id'):
+        query = query.filter(Score.user_id == filters['user_id'])
+    if filters.get('date_from'):
+        query = query.filter(Score.time_stamp_of_attempt >= datetime.strptime(filters['date_from'], '%Y-%m-%d'))
+    if filters.get('date_to'):
+        date_to = datetime.strptime(filters['date_to'], '%Y-%m-%d') + timedelta(days=1)
+        query = query.filter(Score.time_stamp_of_attempt < date_to)
+    if before:
+        timestamp, score_id = before.rsplit('_', 1)
+        query = query.filter(db.tuple_(Score.time_stamp_of_attempt, Score.id) <
+                             (datetime.fromisoformat(timestamp), int(score_id)))
+    return query.order_by(Score.time_stamp_of_attempt.desc(), Score.id.desc())
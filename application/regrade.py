@@ -0,0 +1,62 @@
+# Bulk regrade of stored attempts after an answer key change.
+# Stored answers are streamed in chunks into a (attempts x questions) int8 matrix, rescored in one
+# vectorized comparison against the current key, and only the changed totals are written back.
+import numpy as np
+from sqlalchemy import bindparam
+from application.extensions import db
+from application.models import Quiz, Score, QuizStats, QuestionStats, ScoreHistogram
+from application.answer_keys import answer_matrix, compile_answer_key
+from application.leaderboard import invalidate_leaderboard
+
+class RegradeResult:
+    def __init__(self, quiz_id):
+        self.quiz_id = quiz_id
+        self.attempts = 0
+        self.changed = 0
+
+def regrade_quiz(quiz_id, chunk_size=5000):
+    """Recompute total_scored for every attempt of a quiz against its current answer key."""
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise ValueError(f"Quiz {quiz_id} not found")
+    key = compile_answer_key(quiz.id, quiz.content_version)
+    correct = key.correct_array()
+    result = RegradeResult(quiz.id)
+
+    changed_ids, changed_totals = [], []
+    query = db.select(Score.id, Score.total_scored, Score.answers_raw)\
+              .where(Score.quiz_id == quiz.id)\
+              .order_by(Score.id)\
+              .execution_options(yield_per=chunk_size)
+    for chunk in db.session.execute(query).partitions():
+        matrix = answer_matrix((row[2] for row in chunk), key, len(chunk))
+        new_totals = (matrix == correct).sum(axis=1)
+        ids = np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk))
+        old_totals = np.fromiter((row[1] for row in chunk), dtype=np.int64, count=len(chunk))
+        diff = new_totals != old_totals
+        changed_ids.append(ids[diff])
+        changed_totals.append(new_totals[diff])
+        result.attempts += len(chunk)
+
+    # Write back only the attempts whose score moved, in chunked executemany UPDATEs
+    scores = Score.__table__
+    statement = scores.update()\
+                      .where(scores.c.id == bindparam('score_id'))\
+                      .values(total_scored=bindparam('new_total'))
+    ids = np.concatenate(changed_ids) if changed_ids else np.empty(0, dtype=np.int64)
+    totals = np.concatenate(changed_totals) if changed_totals else np.empty(0, dtype=np.int64)
+    for start in range(0, len(ids), chunk_size):
+        db.session.execute(statement, [
+            {'score_id': int(score_id), 'new_total': int(total)}
+            for score_id, total in zip(ids[start:start + chunk_size], totals[start:start + chunk_size])])
+    result.changed = len(ids)
+
+    # Rollups depend on totals and on which answers are correct; the QuizStats rebuild bumps
+    # scores_version, which retires leaderboards and item analyses in every worker. The quiz
+    # content is unchanged, so answer keys and rendered questions stay cached.
+    QuizStats.rebuild([quiz.id])
+    ScoreHistogram.rebuild([quiz.id])
+    QuestionStats.rebuild([quiz.id], batch_size=chunk_size)
+    db.session.commit()
+    invalidate_leaderboard(quiz.id)
+    return result
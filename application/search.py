@@ -0,0 +1,86 @@
+# Full-text search over users, subjects, quizzes and questions.
+# On SQLite each searchable column is mirrored into an external-content FTS5 table kept in
+# sync by triggers; other backends (or databases without the index) fall back to ILIKE scans.
+import re
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from application.extensions import db
+from application.models import User, Subject, Quiz, Question
+
+# result key -> (model, indexed column)
+SEARCH_FIELDS = {
+    'users': (User, 'username'),
+    'subjects': (Subject, 'name'),
+    'quizzes': (Quiz, 'quiz_name'),
+    'questions': (Question, 'question_statement'),
+}
+
+def _fts_table(model):
+    return f"{model.__tablename__}_fts"
+
+def _index_ddl(model, column):
+    table, fts = model.__tablename__, _fts_table(model)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    ]
+
+def reindex():
+    """Create the FTS5 tables and triggers if needed and rebuild them from the base tables."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    for model, column in SEARCH_FIELDS.values():
+        for statement in _index_ddl(model, column):
+            db.session.execute(text(statement))
+        fts = _fts_table(model)
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    db.session.commit()
+    return True
+
+def _match_expression(term):
+    # Quote every word and prefix-match it so partial input still finds results
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+def _search_fts(model, term, limit, offset):
+    match = _match_expression(term)
+    if not match:
+        return []
+    fts = _fts_table(model)
+    ids = [row[0] for row in db.session.execute(
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match "
+             f"ORDER BY bm25({fts}) LIMIT :limit OFFSET :offset"),
+        {'match': match, 'limit': limit, 'offset': offset})]
+    if not ids:
+        return []
+    by_id = {obj.id: obj for obj in model.query.filter(model.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+def _search_entity(model, column, term, limit, offset):
+    if db.engine.dialect.name == 'sqlite':
+        # Asked per query rather than remembered, so a migration or downgrade run by another
+        # process takes effect without a restart
+        try:
+            return _search_fts(model, term, limit, offset)
+        except OperationalError:
+            pass  # no FTS table in this database (not created yet, or dropped)
+
+    attr = getattr(model, column)
+    return model.query.filter(attr.ilike(f'%{term}%'))\
+                      .order_by(attr, model.id)\
+                      .limit(limit).offset(offset).all()
+
+def search(term, entities, limit=None, offset=0):
+    """Return {entity: [model, ...]} with at most `limit` ranked matches per entity."""
+    limit = limit or current_app.config.get('SEARCH_RESULT_LIMIT', 20)
+    return {
+        entity: _search_entity(*SEARCH_FIELDS[entity], term, limit, offset)
+        for entity in entities
+    }
@@ -0,0 +1,258 @@
+# Group-commit pipeline for quiz submissions.
+# Request threads hand graded submissions to a single writer thread and block until their batch
+# is committed. The writer inserts every score of a batch, folds the rollups once per quiz and
+# commits once, so a burst of N submissions costs a handful of fsyncs instead of N.
+# Scores are inserted with ON CONFLICT (user_id, quiz_id) DO NOTHING: a repeated submission
+# (double click, retry, second tab) is detected from the rows the insert returns and is
+# reported as DuplicateSubmission without storing anything or touching the rollups. Dialects
+# without ON CONFLICT insert row by row and skip the rows the unique index rejects.
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from application.extensions import db
+from application.models import AnswerLayout, Score, QuizStats, QuestionStats, ScoreHistogram
+from application.leaderboard import record_scores
+from application.db_routing import mark_recent_write
+
+class SubmissionError(Exception):
+    """The submission could not be stored."""
+
+class SubmissionBusy(SubmissionError):
+    """The pipeline queue is full (back-pressure); the client should retry."""
+
+class DuplicateSubmission(SubmissionError):
+    """The user already has a stored attempt for this quiz."""
+
+class Submission:
+    __slots__ = ('quiz_id', 'user_id', 'total_scored', 'answers', 'submitted_at', 'answer_key', 'future')
+
+    def __init__(self, quiz_id, user_id, total_scored, answers, submitted_at, answer_key):
+        self.quiz_id = quiz_id
+        self.user_id = user_id
+        self.total_scored = total_scored
+        self.answers = answers          # question_id -> chosen option
+        self.submitted_at = submitted_at
+        self.answer_key = answer_key    # [(question_id, correct_option), ...]
+        self.future = Future()
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING ... RETURNING
+_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def _insert_scores(rows):
+    """Insert score rows, skipping (user_id, quiz_id) pairs already stored; returns {(user_id, quiz_id): id}."""
+    insert = _INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _insert_scores_each(rows)
+    statement = insert(Score).on_conflict_do_nothing(index_elements=['user_id', 'quiz_id'])
+    result = db.session.execute(statement.returning(Score.id, Score.user_id, Score.quiz_id), rows)
+    return {(user_id, quiz_id): score_id for score_id, user_id, quiz_id in result}
+
+def _insert_scores_each(rows):
+    # Other dialects: one INSERT per row in a savepoint, so the unique (user_id, quiz_id) index
+    # rejects only the duplicate row and nothing relies on RETURNING
+    stored = {}
+    for row in rows:
+        score = Score(**row)
+        try:
+            with db.session.begin_nested():
+                db.session.add(score)
+        except IntegrityError:
+            # Other integrity failures (e.g. a deleted quiz) are not duplicates: fail the row
+            if not _already_attempted(row['quiz_id'], row['user_id']):
+                raise
+            continue
+        stored[(row['user_id'], row['quiz_id'])] = score.id
+    return stored
+
+def _already_attempted(quiz_id, user_id):
+    return db.session.query(Score.latest(quiz_id, user_id).exists()).scalar()
+
+def store_submissions(submissions):
+    """Insert the scores and fold the rollups for a batch in the current session (no commit).
+
+    Returns one (quiz_id, score_id, user_id, total_scored, submitted_at) row per submission, or
+    None for a submission whose user already has an attempt at the quiz.
+    """
+    # Within the batch only the first submission of a user for a quiz can be stored
+    firsts = {}
+    for sub in submissions:
+        firsts.setdefault((sub.user_id, sub.quiz_id), sub)
+    by_quiz = {}
+    for sub in firsts.values():
+        by_quiz.setdefault(sub.quiz_id, []).append(sub)
+    # Answer sheets are packed against the question order of the key they were graded with
+    layouts = {}
+    for quiz_id, quiz_subs in by_quiz.items():
+        question_ids = [question_id for question_id, _ in quiz_subs[0].answer_key]
+        layouts[quiz_id] = AnswerLayout.id_for(quiz_id, question_ids), question_ids
+
+    stored = _insert_scores([{
+        'quiz_id': sub.quiz_id,
+        'user_id': sub.user_id,
+        'total_scored': sub.total_scored,
+        'time_stamp_of_attempt': sub.submitted_at,
+        'answers_raw': Score.encode_answers(sub.answers, *layouts[sub.quiz_id]),
+    } for sub in firsts.values()])
+
+    # Only newly stored attempts count towards the rollups
+    for quiz_id, quiz_subs in by_quiz.items():
+        quiz_subs = [sub for sub in quiz_subs if (sub.user_id, quiz_id) in stored]
+        if not quiz_subs:
+            continue
+        QuizStats.record_many(quiz_id, [sub.total_scored for sub in quiz_subs])
+        ScoreHistogram.record_many(quiz_id, [sub.total_scored for sub in quiz_subs])
+        QuestionStats.record_many(quiz_subs[0].answer_key, [sub.answers for sub in quiz_subs])
+    db.session.flush()
+
+    rows = []
+    for sub in submissions:
+        key = (sub.user_id, sub.quiz_id)
+        if firsts[key] is sub and key in stored:
+            rows.append((sub.quiz_id, stored[key], sub.user_id, sub.total_scored, sub.submitted_at))
+        else:
+            rows.append(None)
+    return rows
+
+class SubmissionPipeline:
+    def __init__(self, app, max_batch=200, max_wait=0.01, queue_size=5000, enqueue_timeout=1.0, timeout=30):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_wait = max_wait                # seconds the writer lingers to fill a batch
+        self.enqueue_timeout = enqueue_timeout  # seconds to wait for queue space before rejecting
+        self.timeout = timeout                  # seconds a request waits for its commit
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self.batches = 0
+        self.committed = 0
+
+    def submit(self, submission):
+        """Enqueue and block until the submission is durably stored; returns the new Score id.
+
+        Raises DuplicateSubmission when the user already has an attempt for the quiz.
+        """
+        if self._stopping:
+            raise SubmissionError("Submission pipeline is shutting down")
+        self._ensure_writer()
+        try:
+            self._queue.put(submission, timeout=self.enqueue_timeout)
+        except queue.Full:
+            raise SubmissionBusy("Too many submissions in flight")
+        try:
+            return submission.future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise SubmissionError("Timed out waiting for the submission to be stored")
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return [sub for sub in batch if sub is not None]
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    try:
+                        self._write(batch)
+                    except Exception:
+                        current_app.logger.exception("Submission writer failed")
+                        for sub in batch:
+                            if not sub.future.done():
+                                sub.future.set_exception(SubmissionError("Submission failed"))
+                    finally:
+                        db.session.remove()
+                if self._stopping and self._queue.empty():
+                    return
+
+    def _write(self, batch):
+        try:
+            rows = store_submissions(batch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            if len(batch) == 1:
+                current_app.logger.exception("Storing submission failed")
+                batch[0].future.set_exception(SubmissionError("Submission failed"))
+                return
+            # Isolate the failing submission(s) by retrying one at a time
+            for sub in batch:
+                self._write([sub])
+            return
+        stored = [row for row in rows if row is not None]
+        self.batches += 1
+        self.committed += len(stored)
+        for sub, row in zip(batch, rows):
+            if row is None:
+                sub.future.set_exception(DuplicateSubmission("Quiz already attempted"))
+            else:
+                sub.future.set_result(row[1])
+        record_scores(stored)
+
+    def close(self):
+        """Drain pending submissions and stop the writer."""
+        self._stopping = True
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=self.enqueue_timeout)
+            except queue.Full:
+                pass  # the writer is busy draining and will see _stopping
+            self._thread.join(timeout=self.timeout)
+
+def init_submissions(app):
+    if not app.config.get('SUBMISSION_PIPELINE_ENABLED', False):
+        return None
+    pipeline = SubmissionPipeline(
+        app,
+        max_batch=app.config.get('SUBMISSION_BATCH_SIZE', 200),
+        max_wait=app.config.get('SUBMISSION_MAX_WAIT', 0.01),
+        queue_size=app.config.get('SUBMISSION_QUEUE_SIZE', 5000),
+        enqueue_timeout=app.config.get('SUBMISSION_ENQUEUE_TIMEOUT', 1.0),
+        timeout=app.config.get('SUBMISSION_TIMEOUT', 30))
+    app.extensions['submissions'] = pipeline
+    atexit.register(pipeline.close)
+    return pipeline
+
+def submit_score(quiz_id, user_id, total_scored, answers, submitted_at, answer_key):
+    """Store a graded submission through the pipeline (or inline when it is disabled).
+
+    Returns the new Score id; raises DuplicateSubmission if the user already attempted the quiz.
+    """
+    submission = Submission(quiz_id, user_id, total_scored, answers, submitted_at, answer_key)
+    # The student's results page must read their attempt even if it is stored by the writer thread
+    mark_recent_write()
+    pipeline = current_app.extensions.get('submissions')
+    if pipeline is not None:
+        # Hand this request's pooled connection back while waiting so the writer is never starved
+        db.session.close()
+        return pipeline.submit(submission)
+    try:
+        rows = store_submissions([submission])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise SubmissionError("Submission failed")
+    if rows[0] is None:
+        raise DuplicateSubmission("Quiz already attempted")
+    record_scores(rows)
+    return rows[0][1]
@@ -0,0 +1,74 @@
+# Cached Flask-Login user loader.
+# Requests get a lightweight, read-only identity instead of a full User row; the cache entry is
+# dropped whenever one of the identity columns changes or the user is deleted.
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from application.caching import LRUCache, invalidate_after_commit
+from application.db_routing import on_primary
+from application.extensions import db
+from application.models import User
+
+IDENTITY_FIELDS = ('id', 'username', 'full_name', 'email', 'avatar', 'is_admin', 'is_active')
+
+class CachedUser(UserMixin):
+    """Read-only snapshot of the User columns needed on every request."""
+    __slots__ = IDENTITY_FIELDS
+
+    def __init__(self, **fields):
+        for name in IDENTITY_FIELDS:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CachedUser is read-only; load the User model to make changes")
+
+    def __repr__(self):
+        return f"<CachedUser {self.id} - {self.username}>"
+
+def init_user_cache(app):
+    app.extensions['user_cache'] = LRUCache(
+        maxsize=app.config.get('USER_CACHE_SIZE', 1024),
+        ttl=app.config.get('USER_CACHE_TTL', 300))
+
+def _cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('user_cache')
+
+def load_cached_user(user_id):
+    cache = _cache()
+    cached = cache.get(user_id) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    columns = [getattr(User, name) for name in IDENTITY_FIELDS]
+    with on_primary():  # a freshly registered user may not be on the replica yet
+        row = db.session.query(*columns).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    identity = CachedUser(**row._asdict())
+    if cache is not None:
+        cache.set(user_id, identity)
+    return identity
+
+def invalidate_user(user_id):
+    cache = _cache()
+    if cache is not None:
+        cache.pop(user_id)
+
+# --- Invalidation through model events ---
+
+def _mark_stale(target):
+    user_id = target.id
+    invalidate_after_commit(object_session(target), ('user', user_id), lambda: invalidate_user(user_id))
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in IDENTITY_FIELDS):
+        _mark_stale(target)
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _mark_stale(target)
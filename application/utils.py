@@ -14,13 +14,6 @@ def save_file(file):
     file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
     return filename
 
-def calculate_score(quiz, submitted_answers):
-    """Score calculation logic (newly added)"""
-    return sum(
-        1 for question in quiz.questions
-        if str(submitted_answers.get(f'question_{question.id}')) == str(question.correct_option)
-    )
-
 def delete_file(filename):
     """Secure file deletion with error handling"""
     if not filename:
@@ -36,4 +29,15 @@ def delete_file(filename):
         return False
     except Exception as e:
         current_app.logger.error(f"File deletion failed: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def start_on_first_request(app, start):
+    """Call start() before every request; it must be idempotent and cheap once running.
+
+    Background threads are started with the first request a worker serves rather than in
+    create_app, because CLI commands (migrations, rebuilds) create the app too and must never
+    spawn them.
+    """
+    @app.before_request
+    def start_background_work():
+        start()
@@ -0,0 +1,181 @@
+# Pre-start cache warming for upcoming quizzes.
+# Quizzes opening within WARMING_HORIZON are kept in a heap ordered by start time; a background
+# thread sleeps until the next one is WARMING_LEAD_TIME seconds from opening and then loads its
+# snapshot, answer key and rendered questions into this worker's caches. The heap is fed by
+# range scans of the next horizon slice and by Quiz commits, never by full-table polling.
+import atexit
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from application.caching import after_commit
+from application.extensions import db
+from application.models import Quiz
+from application.answer_keys import get_answer_key
+from application.fragments import render_quiz_questions
+from application.quiz_content import get_quiz_content
+from application.utils import start_on_first_request
+
+class WarmResult:
+    def __init__(self, quiz_id):
+        self.quiz_id = quiz_id
+        self.found = False
+        self.questions = 0
+        self.fragment_bytes = 0
+        self.seconds = 0.0
+
+def warm_quiz(quiz_id):
+    """Load a quiz's snapshot, answer key and question fragment into the caches."""
+    result = WarmResult(quiz_id)
+    started = time.perf_counter()
+    quiz = get_quiz_content(quiz_id, fresh=True)
+    if quiz is not None:
+        result.found = True
+        result.questions = len(get_answer_key(quiz))
+        result.fragment_bytes = len(render_quiz_questions(quiz))
+    result.seconds = time.perf_counter() - started
+    return result
+
+class WarmingScheduler:
+    def __init__(self, app, horizon=3600, lead_time=120):
+        self.app = app
+        self.horizon = horizon      # seconds ahead that upcoming quizzes are tracked
+        self.lead_time = lead_time  # seconds before start_time that a quiz is warmed
+        self._heap = []             # (start_time, quiz_id)
+        self._scheduled = {}        # quiz id -> start_time of its live heap entry
+        self._loaded_until = None   # end of the start_time range already scanned
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.warmed = 0
+
+    def schedule(self, quiz_id, start_time):
+        """Track a quiz (re)scheduled to open at start_time; ignored if outside the scanned range."""
+        with self._cond:
+            if self._loaded_until is None or start_time is None or start_time > self._loaded_until:
+                return False  # the next range scan picks it up
+            if start_time <= datetime.now():
+                return False  # already open; its first request loads it
+            if self._scheduled.get(quiz_id) == start_time:
+                return True
+            self._scheduled[quiz_id] = start_time
+            heapq.heappush(self._heap, (start_time, quiz_id))
+            self._cond.notify()
+        return True
+
+    def unschedule(self, quiz_id):
+        with self._cond:
+            self._scheduled.pop(quiz_id, None)  # its heap entry is skipped when popped
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='quiz-warming', daemon=True)
+                self._thread.start()
+
+    def _scan(self, now):
+        # Load quizzes opening in the not-yet-scanned part of [now, now + horizon]
+        until = now + timedelta(seconds=self.horizon)
+        since = self._loaded_until or now
+        rows = Quiz.opening_between(since, until).all()
+        with self._cond:
+            self._loaded_until = until
+        for quiz_id, start_time in rows:
+            self.schedule(quiz_id, start_time)
+
+    def _next_due(self, now):
+        # Pop the next live entry that is due, or return the seconds to sleep
+        with self._cond:
+            while self._heap:
+                start_time, quiz_id = self._heap[0]
+                if self._scheduled.get(quiz_id) != start_time:
+                    heapq.heappop(self._heap)  # rescheduled or removed since it was pushed
+                    continue
+                wait = (start_time - timedelta(seconds=self.lead_time) - now).total_seconds()
+                if wait > 0:
+                    return None, wait
+                heapq.heappop(self._heap)
+                del self._scheduled[quiz_id]
+                return quiz_id, 0
+            return None, None
+
+    def _run(self):
+        with self.app.app_context():
+            while not self._stopping:
+                now = datetime.now()  # start times are naive server-local, as in attempt_quiz
+                try:
+                    if self._loaded_until is None or (self._loaded_until - now).total_seconds() < self.horizon / 2:
+                        self._scan(now)
+                    quiz_id, wait = self._next_due(now)
+                    if quiz_id is not None:
+                        warm_quiz(quiz_id)
+                        self.warmed += 1
+                        continue
+                except Exception:
+                    current_app.logger.exception("Quiz warming failed")
+                    wait = None
+                finally:
+                    db.session.remove()
+                # Sleep until the next warm-up or the next range scan, whichever is sooner
+                rescan = (self._loaded_until - now).total_seconds() - self.horizon / 2 if self._loaded_until else 0
+                timeout = max(1.0, min(rescan, wait) if wait is not None else rescan)
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(timeout)
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        return {
+            'scheduled': len(self._scheduled),
+            'warmed': self.warmed,
+            'loaded_until': self._loaded_until.isoformat() if self._loaded_until else None,
+        }
+
+def init_warming(app):
+    if not app.config.get('WARMING_ENABLED', False):
+        return None
+    scheduler = WarmingScheduler(
+        app,
+        horizon=app.config.get('WARMING_HORIZON', 3600),
+        lead_time=app.config.get('WARMING_LEAD_TIME', 120))
+    app.extensions['warming'] = scheduler
+    atexit.register(scheduler.close)
+
+    start_on_first_request(app, scheduler.ensure_started)
+    return scheduler
+
+# --- Scheduling through model events ---
+
+def _scheduler():
+    return current_app.extensions.get('warming') if has_app_context() else None
+
+def _reschedule(quiz_id, start_time):
+    scheduler = _scheduler()
+    if scheduler is None:
+        return
+    if start_time is None:
+        scheduler.unschedule(quiz_id)
+    else:
+        scheduler.schedule(quiz_id, start_time)
+
+@event.listens_for(Quiz, 'after_insert')
+@event.listens_for(Quiz, 'after_update')
+def _quiz_saved(mapper, connection, target):
+    quiz_id, start_time = target.id, target.start_time
+    after_commit(object_session(target), ('warming', quiz_id), lambda: _reschedule(quiz_id, start_time))
+
+@event.listens_for(Quiz, 'after_delete')
+def _quiz_deleted(mapper, connection, target):
+    quiz_id = target.id
+    after_commit(object_session(target), ('warming', quiz_id), lambda: _reschedule(quiz_id, None))
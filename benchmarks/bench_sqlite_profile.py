@@ -0,0 +1,127 @@
+"""Mixed read/write throughput: SQLite defaults vs. the production engine profile.
+
+Run from the repository root:
+    python benchmarks/bench_sqlite_profile.py [--ops 4000] [--workers 4] [--threads 8] [--writes 0.2]
+Each run uses a fresh SQLite file with the submission pipeline disabled, so every write is its own
+transaction contending for the database lock. Worker processes (like gunicorn workers) each run a
+thread pool mixing dashboard-style reads (available quizzes, a student's attempts, the score
+rollup) with graded submissions.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from application import create_app, db
+from application.models import User, Subject, Chapter, Quiz, Question, Score, QuizStats
+from application.submissions import Submission, store_submissions
+
+def make_app(path, profile):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SQLITE_PROFILE = profile
+        SUBMISSION_PIPELINE_ENABLED = False
+        WARMING_ENABLED = False
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def seed(app, students, questions):
+    with app.app_context():
+        chapter = Chapter(name='Bench', subject=Subject(name='Bench'))
+        quiz = Quiz(quiz_name='Bench', start_time=datetime.now() - timedelta(minutes=5), duration=60, chapter=chapter)
+        db.session.add(quiz)
+        for i in range(questions):
+            db.session.add(Question(quiz=quiz, question_statement=f'Q{i}', option1='a', option2='b',
+                                    option3='c', option4='d', correct_option=i % 4 + 1))
+        db.session.flush()
+        db.session.execute(db.insert(User), [
+            {'username': f'student{i}', 'email': f's{i}@example.com', 'full_name': f'Student {i}',
+             'password_hash': 'x'} for i in range(students)])
+        db.session.commit()
+        key = [(q.id, q.correct_option) for q in quiz.questions]
+        return quiz.id, key, [u.id for u in User.query.all()]
+
+def work(path, profile, quiz_id, key, plan, threads):
+    """Run one worker's share of the plan; returns (reads, writes, failures)."""
+    app = make_app(path, profile)
+    reads = writes = 0
+    failures = []
+
+    def one(step):
+        nonlocal reads, writes
+        is_write, user_id = step
+        with app.app_context():
+            try:
+                if is_write:
+                    answers = {qid: random.randint(1, 4) for qid, _ in key}
+                    total = sum(1 for qid, correct in key if answers[qid] == correct)
+                    store_submissions([Submission(quiz_id, user_id, total, answers, datetime.now(), key)])
+                    db.session.commit()
+                    writes += 1
+                else:
+                    Quiz.available().all()
+                    db.session.query(Score.id, Score.total_scored)\
+                              .filter(Score.user_id == user_id).all()
+                    db.session.get(QuizStats, quiz_id)
+                    db.session.commit()
+                    reads += 1
+            except Exception as e:
+                db.session.rollback()
+                failures.append(type(e).__name__)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, plan))
+    with app.app_context():
+        db.engine.dispose()
+    return reads, writes, failures
+
+def run(profile, ops, workers, threads, write_ratio, questions):
+    # The directory also takes the -wal/-shm side files with it
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        app = make_app(path, profile)
+        quiz_id, key, user_ids = seed(app, ops, questions)
+        with app.app_context():
+            journal = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+            db.engine.dispose()
+        random.seed(0)
+        plan = [(random.random() < write_ratio, user_id) for user_id in user_ids[:ops]]
+        shares = [plan[i::workers] for i in range(workers)]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(work, [path] * workers, [profile] * workers, [quiz_id] * workers,
+                                    [key] * workers, shares, [threads] * workers))
+        elapsed = time.perf_counter() - start
+
+    reads = sum(r for r, _, _ in results)
+    writes = sum(w for _, w, _ in results)
+    failures = [f for _, _, fs in results for f in fs]
+    return journal, elapsed, reads, writes, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=4000)
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per worker')
+    parser.add_argument('--writes', type=float, default=0.2, help='fraction of operations that submit')
+    parser.add_argument('--questions', type=int, default=20)
+    args = parser.parse_args()
+
+    for profile in ('default', 'production'):
+        journal, elapsed, reads, writes, failures = run(profile, args.ops, args.workers, args.threads,
+                                                        args.writes, args.questions)
+        print(f"{profile:11s} journal={journal:8s} {reads:6d} reads  {writes:6d} writes  "
+              f"{len(failures):5d} failed  {elapsed:7.2f}s  {(reads + writes) / elapsed:8.1f} ops/s")
+
+if __name__ == '__main__':
+    main()
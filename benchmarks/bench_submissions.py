@@ -0,0 +1,94 @@
+"""Submit throughput: one commit per submission vs. the group-commit pipeline.
+
+Run from the repository root:  python benchmarks/bench_submissions.py [--students 2000] [--threads 32]
+Each run uses a fresh SQLite file, seeds one quiz and N students, then has a thread pool submit
+one graded attempt per student as fast as possible.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from application import create_app, db
+from application.models import User, Subject, Chapter, Quiz, Question, Score
+from application.submissions import Submission, store_submissions, submit_score
+
+def make_app(path, pipeline):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SUBMISSION_PIPELINE_ENABLED = pipeline
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def seed(app, students, questions):
+    with app.app_context():
+        chapter = Chapter(name='Bench', subject=Subject(name='Bench'))
+        quiz = Quiz(quiz_name='Bench', start_time=datetime.now() - timedelta(minutes=5), duration=60, chapter=chapter)
+        db.session.add(quiz)
+        for i in range(questions):
+            db.session.add(Question(quiz=quiz, question_statement=f'Q{i}', option1='a', option2='b',
+                                    option3='c', option4='d', correct_option=i % 4 + 1))
+        db.session.flush()
+        db.session.execute(db.insert(User), [
+            {'username': f'student{i}', 'email': f's{i}@example.com', 'full_name': f'Student {i}',
+             'password_hash': 'x'} for i in range(students)])
+        db.session.commit()
+        key = [(q.id, q.correct_option) for q in quiz.questions]
+        return quiz.id, key, [u.id for u in User.query.all()]
+
+def run(pipeline, students, threads, questions):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        app = make_app(path, pipeline)
+        quiz_id, key, user_ids = seed(app, students, questions)
+        failures = []
+
+        def one(user_id):
+            answers = {qid: random.randint(1, 4) for qid, _ in key}
+            total = sum(1 for qid, correct in key if answers[qid] == correct)
+            with app.app_context():
+                try:
+                    if pipeline:
+                        submit_score(quiz_id, user_id, total, answers, datetime.now(), key)
+                    else:
+                        # Pre-pipeline behaviour: every request commits its own transaction
+                        store_submissions([Submission(quiz_id, user_id, total, answers, datetime.now(), key)])
+                        db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    failures.append(type(e).__name__)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(one, user_ids))
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            stored = Score.query.count()
+        if pipeline:
+            app.extensions['submissions'].close()
+    return elapsed, stored, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--questions', type=int, default=20)
+    args = parser.parse_args()
+
+    for label, pipeline in (('commit per submission', False), ('group-commit pipeline', True)):
+        elapsed, stored, failures = run(pipeline, args.students, args.threads, args.questions)
+        print(f"{label:24s} {stored:6d} stored  {len(failures):5d} failed  "
+              f"{elapsed:7.2f}s  {stored / elapsed:8.1f} submits/s")
+
+if __name__ == '__main__':
+    main()
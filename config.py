@@ -11,6 +11,11 @@ instance_path = basedir / 'instance'
 upload_path = instance_path / 'uploads'
 WTF_CSRF_ENABLED = False
 
+def env_flag(name, default=False):
+    """Boolean setting from the environment ('1', 'true', 'yes' or 'on' enable it)."""
+    value = os.environ.get(name)
+    return default if value is None else value.strip().lower() in ('1', 'true', 'yes', 'on')
+
 class Config:
     # Core Settings
     # Use a FIXED SECRET_KEY instead of os.urandom(24)
@@ -22,6 +27,20 @@ class Config:
         f'sqlite:///{instance_path}/quiz_master.db'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite engine profile: 'default' (SQLite as shipped) or 'production' (WAL, busy timeout,
+    # synchronous=NORMAL, mmap, pooled). Opt in per deployment: it changes durability and adds -wal/-shm files
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+    SQLITE_BUSY_TIMEOUT = 15000             # ms a connection waits for a lock before failing
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024    # bytes of the database file memory-mapped
+    SQLITE_CACHE_SIZE = 16 * 1024 * 1024    # page cache budget per connection, in bytes
+    SQLITE_POOL_SIZE = 10                   # pooled connections kept open per worker
+    SQLITE_MAX_OVERFLOW = 20                # extra connections allowed under load
+
+    # Read replica: read-only views query this bind; unset means a single database
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    REPLICA_SYNC_INTERVAL = 5               # seconds between backups onto a local SQLite replica (0 = replicated externally)
+    READ_YOUR_WRITES_WINDOW = 15            # seconds a user's reads stay on the primary after they write
     
     # Security Headers
     SESSION_COOKIE_SECURE = True
@@ -33,10 +52,42 @@ class Config:
     MAX_CONTENT_LENGTH = 2 * 1024 * 1024  # 2MB
     UPLOAD_FOLDER = upload_path
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+    # Group-commit quiz submissions through a writer thread in each worker (opt in; off stores inline)
+    SUBMISSION_PIPELINE_ENABLED = env_flag('SUBMISSION_PIPELINE_ENABLED')
+    SUBMISSION_BATCH_SIZE = 200       # max submissions per commit
+    SUBMISSION_MAX_WAIT = 0.01        # seconds the writer waits to fill a batch
+    SUBMISSION_QUEUE_SIZE = 5000      # pending submissions before new ones are rejected
+    SUBMISSION_ENQUEUE_TIMEOUT = 1.0  # seconds a request waits for queue space
+    SUBMISSION_TIMEOUT = 30           # seconds a request waits for its batch to commit
+
+    ANSWER_KEY_CACHE_SIZE = 512       # compiled answer keys kept per worker
+    ITEM_ANALYSIS_CACHE_SIZE = 128    # item analyses kept per worker
+    FRAGMENT_CACHE_SIZE = 256         # rendered quiz question bodies kept per worker
+    FRAGMENT_CACHE_BYTES = 32 * 1024 * 1024  # memory budget for rendered fragments
+    QUIZ_CONTENT_CACHE_SIZE = 1024    # quiz snapshots kept per worker
+    QUIZ_CONTENT_TTL = 5              # seconds before a snapshot is reloaded (edits in other workers)
+    CONTENT_TREE_TTL = 10             # seconds before the subject/chapter/quiz tree is reloaded (edits in other workers)
+    SINGLE_FLIGHT_TIMEOUT = 10        # seconds a coalesced request waits before loading itself
+    LEADERBOARD_CACHE_SIZE = 256      # quiz leaderboards kept per worker
+    LEADERBOARD_TOP_N = 10            # default length of the top list
+    WARMING_ENABLED = env_flag('WARMING_ENABLED')  # preload caches for quizzes about to open (thread per worker; opt in)
+    WARMING_HORIZON = 3600            # seconds ahead that upcoming quizzes are tracked
+    WARMING_LEAD_TIME = 120           # seconds before start_time that a quiz is warmed
+
+    # Admin listings
+    ATTEMPTS_PER_PAGE = 50
+
+    # Search
+    SEARCH_RESULT_LIMIT = 20  # max results per entity (users, subjects, quizzes, questions)
     
     # Flask-Login
     REMEMBER_COOKIE_DURATION = timedelta(days=30)
     REMEMBER_COOKIE_SECURE = True
+    USER_CACHE_SIZE = 1024  # cached user identities per worker
+    USER_CACHE_TTL = 300    # seconds before a cached identity is reloaded
+    LAST_SEEN_FLUSH_INTERVAL = 60  # seconds between write-behind flushes of last_seen
+    LAST_SEEN_BATCH_SIZE = 500     # flush early once this many users are pending
 
 class DevelopmentConfig(Config):
     # Development Settings
@@ -0,0 +1,32 @@
+"""Add denormalized question_count to Quiz and attempt listing indexes
+
+Revision ID: a1d6e4f92c37
+Revises: f7c3d1e8b246
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a1d6e4f92c37'
+down_revision = 'f7c3d1e8b246'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute(
+        "UPDATE quizzes SET question_count = "
+        "(SELECT COUNT(*) FROM questions WHERE questions.quiz_id = quizzes.id)")
+
+    op.create_index('idx_score_time_id', 'scores', ['time_stamp_of_attempt', 'id'])
+    op.create_index('idx_score_quiz_time', 'scores', ['quiz_id', 'time_stamp_of_attempt'])
+
+def downgrade():
+    op.drop_index('idx_score_quiz_time', table_name='scores')
+    op.drop_index('idx_score_time_id', table_name='scores')
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_column('question_count')
@@ -0,0 +1,23 @@
+"""Add scores_version to QuizStats for cache versioning after rebuilds
+
+Revision ID: a4e7c2d9b318
+Revises: f1a7d3c9e825
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a4e7c2d9b318'
+down_revision = 'f1a7d3c9e825'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('quiz_stats') as batch_op:
+        batch_op.add_column(sa.Column('scores_version', sa.Integer(), nullable=False, server_default='0'))
+
+def downgrade():
+    with op.batch_alter_table('quiz_stats') as batch_op:
+        batch_op.drop_column('scores_version')
@@ -0,0 +1,23 @@
+"""Add content_version to Quiz for cache versioning
+
+Revision ID: b8e2c5a17f43
+Revises: a1d6e4f92c37
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2c5a17f43'
+down_revision = 'a1d6e4f92c37'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), nullable=False, server_default='1'))
+
+def downgrade():
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_column('content_version')
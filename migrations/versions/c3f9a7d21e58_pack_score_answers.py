@@ -0,0 +1,152 @@
+"""Pack Score.answers into the compact binary answer-sheet format
+
+Revision ID: c3f9a7d21e58
+Revises: b8e2c5a17f43
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3f9a7d21e58'
+down_revision = 'b8e2c5a17f43'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 5000
+
+# Answer-sheet codec (format 1) as of this revision, copied from application.answer_sheets so
+# later changes to the live codec cannot change what this migration reads or writes
+
+FORMAT_PACKED = 1
+BITS_PER_ANSWER = 3
+MAX_OPTION = (1 << BITS_PER_ANSWER) - 1
+
+def _write_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def pack_answers(answers, layout_id, question_ids):
+    positions = {question_id: i for i, question_id in enumerate(question_ids)}
+    codes = 0
+    for question_id, option in answers.items():
+        position = positions.get(int(question_id))
+        if position is None or not isinstance(option, int) or not 0 < option <= MAX_OPTION:
+            return None
+        codes |= option << (position * BITS_PER_ANSWER)
+    out = bytearray((FORMAT_PACKED,))
+    _write_varint(layout_id, out)
+    out += codes.to_bytes((len(question_ids) * BITS_PER_ANSWER + 7) // 8, 'little')
+    return bytes(out)
+
+def dump_json(answers):
+    return json.dumps({str(k): v for k, v in answers.items()}).encode()
+
+def is_packed(raw):
+    return bool(raw) and not isinstance(raw, str) and raw[0] == FORMAT_PACKED
+
+def unpack_codes(raw):
+    layout_id, pos = _read_varint(raw, 1)
+    return layout_id, int.from_bytes(raw[pos:], 'little')
+
+def iter_codes(codes, count):
+    position = 0
+    while codes and position < count:
+        option = codes & MAX_OPTION
+        if option:
+            yield position, option
+        codes >>= BITS_PER_ANSWER
+        position += 1
+
+def load_json(raw):
+    try:
+        return {int(k): v for k, v in json.loads(raw).items()}
+    except (ValueError, TypeError, AttributeError):
+        return {}
+
+def _rewrite_answers(conn, convert):
+    # Walk the scores table in id order, CHUNK_SIZE rows per read and per executemany UPDATE
+    update = sa.text('UPDATE scores SET answers = :answers WHERE id = :score_id')\
+               .bindparams(sa.bindparam('answers', type_=sa.LargeBinary()))
+    select = sa.text('SELECT id, quiz_id, answers FROM scores WHERE id > :last_id ORDER BY id LIMIT :limit')
+    last_id = 0
+    while True:
+        rows = conn.execute(select, {'last_id': last_id, 'limit': CHUNK_SIZE}).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        changes = []
+        for score_id, quiz_id, raw in rows:
+            value = convert(quiz_id, raw) if raw else None
+            if value is not None:
+                changes.append({'score_id': score_id, 'answers': value})
+        if changes:
+            conn.execute(update, changes)
+
+def upgrade():
+    op.create_table(
+        'answer_layouts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('question_ids', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('quiz_id', 'question_ids', name='uq_answer_layout'))
+    with op.batch_alter_table('scores') as batch_op:
+        batch_op.alter_column('answers', existing_type=sa.Text(), type_=sa.LargeBinary(), existing_nullable=True)
+
+    # Existing attempts are packed against their quiz's current questions in id order;
+    # sheets that mention deleted questions stay JSON, which the read path still accepts
+    conn = op.get_bind()
+    layouts = sa.table('answer_layouts', sa.column('id'), sa.column('quiz_id'), sa.column('question_ids'))
+    orders = {}
+    for quiz_id, question_id in conn.execute(sa.text('SELECT quiz_id, id FROM questions ORDER BY quiz_id, id')):
+        orders.setdefault(quiz_id, []).append(question_id)
+    layout_ids = {}
+    for quiz_id, question_ids in orders.items():
+        text = ','.join(map(str, question_ids))
+        conn.execute(layouts.insert().values(quiz_id=quiz_id, question_ids=text))
+        layout_id = conn.execute(sa.select(layouts.c.id)
+                                 .where(layouts.c.quiz_id == quiz_id, layouts.c.question_ids == text)).scalar()
+        layout_ids[quiz_id] = (layout_id, question_ids)
+
+    def convert(quiz_id, raw):
+        if is_packed(raw):
+            return None
+        layout = layout_ids.get(quiz_id)
+        packed = pack_answers(load_json(raw), *layout) if layout else None
+        return packed or (raw.encode() if isinstance(raw, str) else bytes(raw))
+
+    _rewrite_answers(conn, convert)
+
+def downgrade():
+    conn = op.get_bind()
+    orders = {
+        layout_id: [int(question_id) for question_id in text.split(',') if question_id]
+        for layout_id, text in conn.execute(sa.text('SELECT id, question_ids FROM answer_layouts'))}
+
+    def convert(quiz_id, raw):
+        if not is_packed(raw):
+            return None
+        layout_id, codes = unpack_codes(raw)
+        order = orders.get(layout_id, [])
+        return dump_json({order[position]: option for position, option in iter_codes(codes, len(order))})
+
+    _rewrite_answers(conn, convert)
+    with op.batch_alter_table('scores') as batch_op:
+        batch_op.alter_column('answers', existing_type=sa.LargeBinary(), type_=sa.Text(), existing_nullable=True)
+    op.drop_table('answer_layouts')
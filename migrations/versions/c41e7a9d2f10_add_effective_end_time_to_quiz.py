@@ -0,0 +1,45 @@
+"""Add indexed effective_end_time column to Quiz
+
+Revision ID: c41e7a9d2f10
+Revises: 8697cff9d503
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a9d2f10'
+down_revision = '8697cff9d503'
+branch_labels = None
+depends_on = None
+
+quizzes = sa.table(
+    'quizzes',
+    sa.column('id', sa.Integer),
+    sa.column('start_time', sa.DateTime),
+    sa.column('end_time', sa.DateTime),
+    sa.column('duration', sa.Integer),
+    sa.column('effective_end_time', sa.DateTime))
+
+def upgrade():
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.add_column(sa.Column('effective_end_time', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_quizzes_effective_end_time', ['effective_end_time'])
+
+    # Backfill existing quizzes: end_time or start_time + duration
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(
+        quizzes.c.id, quizzes.c.start_time, quizzes.c.end_time, quizzes.c.duration)).fetchall()
+    for quiz_id, start_time, end_time, duration in rows:
+        conn.execute(
+            quizzes.update()
+            .where(quizzes.c.id == quiz_id)
+            .values(effective_end_time=end_time or start_time + timedelta(minutes=duration or 0)))
+
+def downgrade():
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_index('ix_quizzes_effective_end_time')
+        batch_op.drop_column('effective_end_time')
@@ -0,0 +1,36 @@
+"""Add quiz_stats rollup table
+
+Revision ID: d2a8f3b6c915
+Revises: c41e7a9d2f10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd2a8f3b6c915'
+down_revision = 'c41e7a9d2f10'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'quiz_stats',
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('attempt_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Integer(), nullable=False),
+        sa.Column('score_sq_sum', sa.Integer(), nullable=False),
+        sa.Column('min_score', sa.Integer(), nullable=True),
+        sa.Column('max_score', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('quiz_id'))
+
+    # Backfill from existing scores
+    op.execute(
+        "INSERT INTO quiz_stats (quiz_id, attempt_count, score_sum, score_sq_sum, min_score, max_score) "
+        "SELECT quiz_id, COUNT(id), SUM(total_scored), SUM(total_scored * total_scored), "
+        "MIN(total_scored), MAX(total_scored) FROM scores GROUP BY quiz_id")
+
+def downgrade():
+    op.drop_table('quiz_stats')
@@ -0,0 +1,33 @@
+"""Add per-quiz score histograms
+
+Revision ID: d5e8a3c47b91
+Revises: c3f9a7d21e58
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8a3c47b91'
+down_revision = 'c3f9a7d21e58'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'score_histograms',
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('quiz_id', 'score'))
+
+    # Backfill from existing scores
+    op.execute(
+        "INSERT INTO score_histograms (quiz_id, score, count) "
+        "SELECT quiz_id, total_scored, COUNT(id) FROM scores "
+        "GROUP BY quiz_id, total_scored")
+
+def downgrade():
+    op.drop_table('score_histograms')
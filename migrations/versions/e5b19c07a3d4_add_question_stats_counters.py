@@ -0,0 +1,32 @@
+"""Add question_stats per-question counters
+
+Revision ID: e5b19c07a3d4
+Revises: d2a8f3b6c915
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5b19c07a3d4'
+down_revision = 'd2a8f3b6c915'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'question_stats',
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('attempt_count', sa.Integer(), nullable=False),
+        sa.Column('correct_count', sa.Integer(), nullable=False),
+        sa.Column('option1_count', sa.Integer(), nullable=False),
+        sa.Column('option2_count', sa.Integer(), nullable=False),
+        sa.Column('option3_count', sa.Integer(), nullable=False),
+        sa.Column('option4_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('question_id'))
+    # Counters are backfilled from stored answers with `flask rebuild-stats`
+
+def downgrade():
+    op.drop_table('question_stats')
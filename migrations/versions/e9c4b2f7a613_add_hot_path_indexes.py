@@ -0,0 +1,29 @@
+"""Index foreign keys and columns read on hot paths
+
+Revision ID: e9c4b2f7a613
+Revises: d5e8a3c47b91
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e9c4b2f7a613'
+down_revision = 'd5e8a3c47b91'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_questions_quiz_id', 'questions', ['quiz_id'])
+    op.create_index('ix_quizzes_chapter_id', 'quizzes', ['chapter_id'])
+    op.create_index('ix_quizzes_start_time', 'quizzes', ['start_time'])
+    op.create_index('ix_chapters_subject_id', 'chapters', ['subject_id'])
+    op.create_index('idx_score_user_time', 'scores', ['user_id', 'time_stamp_of_attempt'])
+    op.execute('ANALYZE')
+
+def downgrade():
+    op.drop_index('idx_score_user_time', table_name='scores')
+    op.drop_index('ix_chapters_subject_id', table_name='chapters')
+    op.drop_index('ix_quizzes_start_time', table_name='quizzes')
+    op.drop_index('ix_quizzes_chapter_id', table_name='quizzes')
+    op.drop_index('ix_questions_quiz_id', table_name='questions')
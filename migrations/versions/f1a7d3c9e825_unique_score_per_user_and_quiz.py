@@ -0,0 +1,50 @@
+"""Allow one score per user and quiz
+
+Revision ID: f1a7d3c9e825
+Revises: e9c4b2f7a613
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7d3c9e825'
+down_revision = 'e9c4b2f7a613'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    # Keep each user's first attempt at a quiz; later duplicates came from double submissions
+    duplicates = conn.execute(sa.text(
+        "SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "    PARTITION BY user_id, quiz_id ORDER BY time_stamp_of_attempt, id) AS attempt "
+        "  FROM scores) "
+        "WHERE attempt > 1")).scalars().all()
+    if duplicates:
+        conn.execute(sa.text('DELETE FROM scores WHERE id = :score_id'),
+                     [{'score_id': score_id} for score_id in duplicates])
+
+        # Recompute the score rollups without the removed attempts
+        op.execute('DELETE FROM quiz_stats')
+        op.execute(
+            "INSERT INTO quiz_stats (quiz_id, attempt_count, score_sum, score_sq_sum, min_score, max_score) "
+            "SELECT quiz_id, COUNT(id), SUM(total_scored), SUM(total_scored * total_scored), "
+            "MIN(total_scored), MAX(total_scored) FROM scores GROUP BY quiz_id")
+        op.execute('DELETE FROM score_histograms')
+        op.execute(
+            "INSERT INTO score_histograms (quiz_id, score, count) "
+            "SELECT quiz_id, total_scored, COUNT(id) FROM scores "
+            "GROUP BY quiz_id, total_scored")
+        # Per-question counters are parsed from answer sheets: run `flask rebuild-stats`
+        print(f"Removed {len(duplicates)} duplicate scores; run `flask rebuild-stats` to refresh question counters.")
+
+    op.drop_index('idx_user_quiz', table_name='scores')
+    op.create_index('uq_score_user_quiz', 'scores', ['user_id', 'quiz_id'], unique=True)
+
+def downgrade():
+    # Removed duplicate attempts are not restored
+    op.drop_index('uq_score_user_quiz', table_name='scores')
+    op.create_index('idx_user_quiz', 'scores', ['user_id', 'quiz_id'])
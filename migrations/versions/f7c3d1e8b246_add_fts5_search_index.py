@@ -0,0 +1,49 @@
+"""Add FTS5 search index with sync triggers (SQLite only)
+
+Revision ID: f7c3d1e8b246
+Revises: e5b19c07a3d4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f7c3d1e8b246'
+down_revision = 'e5b19c07a3d4'
+branch_labels = None
+depends_on = None
+
+# table -> indexed column
+SEARCH_FIELDS = {
+    'users': 'username',
+    'subjects': 'name',
+    'quizzes': 'quiz_name',
+    'questions': 'question_statement',
+}
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # other backends use LIKE fallback
+    for table, column in SEARCH_FIELDS.items():
+        fts = f"{table}_fts"
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END")
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END")
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in SEARCH_FIELDS:
+        fts = f"{table}_fts"
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import flask_migrate
+import pytest
+from config import Config
+from application import create_app
+from application.extensions import db
+from application.models import (AnswerLayout, Chapter, Question, QuestionStats, Quiz, QuizStats, Score,
+                                ScoreHistogram, Subject, User)
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / 'migrations'
+
+SUBJECTS = 5
+CHAPTERS_PER_SUBJECT = 4
+QUIZZES_PER_CHAPTER = 10
+QUESTIONS_PER_QUIZ = 10
+USERS = 500
+ATTEMPTS_PER_USER = 20
+
+def _insert(model, rows):
+    db.session.execute(model.__table__.insert(), rows)
+
+def seed():
+    """A few thousand rows shaped like a live deployment, inserted with Core statements."""
+    start = datetime(2025, 9, 1, 9, 0)
+    _insert(Subject, [{'id': s, 'name': f'Subject {s}'} for s in range(1, SUBJECTS + 1)])
+    chapters = range(1, SUBJECTS * CHAPTERS_PER_SUBJECT + 1)
+    _insert(Chapter, [{'id': c, 'name': f'Chapter {c}', 'subject_id': (c - 1) // CHAPTERS_PER_SUBJECT + 1}
+                      for c in chapters])
+    quizzes = range(1, len(chapters) * QUIZZES_PER_CHAPTER + 1)
+    _insert(Quiz, [{'id': q, 'quiz_name': f'Quiz {q}', 'chapter_id': (q - 1) // QUIZZES_PER_CHAPTER + 1,
+                    'start_time': start + timedelta(days=q), 'effective_end_time': start + timedelta(days=q, hours=1),
+                    'duration': 60, 'question_count': QUESTIONS_PER_QUIZ} for q in quizzes])
+    questions = range(1, len(quizzes) * QUESTIONS_PER_QUIZ + 1)
+    _insert(Question, [{'id': n, 'quiz_id': (n - 1) // QUESTIONS_PER_QUIZ + 1, 'question_statement': f'Question {n}',
+                        'option1': 'a', 'option2': 'b', 'option3': 'c', 'option4': 'd', 'correct_option': n % 4 + 1}
+                       for n in questions])
+    _insert(QuestionStats, [{'question_id': n, 'attempt_count': 50, 'correct_count': 25} for n in questions])
+    _insert(AnswerLayout, [{'quiz_id': q, 'question_ids': ','.join(
+        str(n) for n in range((q - 1) * QUESTIONS_PER_QUIZ + 1, q * QUESTIONS_PER_QUIZ + 1))} for q in quizzes])
+    _insert(User, [{'id': u, 'username': f'user{u}', 'password_hash': 'x', 'full_name': f'User {u}',
+                    'email': f'user{u}@example.com'} for u in range(1, USERS + 1)])
+    # One attempt per (user, quiz): each user takes a different run of quizzes
+    _insert(Score, [{'user_id': u, 'quiz_id': (u + k * 7) % len(quizzes) + 1, 'total_scored': (u + k) % 11,
+                     'time_stamp_of_attempt': start + timedelta(days=k, minutes=u)}
+                    for u in range(1, USERS + 1) for k in range(ATTEMPTS_PER_USER)])
+    _insert(QuizStats, [{'quiz_id': q, 'attempt_count': 50, 'score_sum': 250, 'score_sq_sum': 1500} for q in quizzes])
+    _insert(ScoreHistogram, [{'quiz_id': q, 'score': s, 'count': 5} for q in quizzes for s in range(11)])
+    db.session.commit()
+    # Plans follow the statistics of a live database, not the heuristics used for empty tables
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('db') / 'quiz_master.db'}"
+        REPLICA_DATABASE_URL = None
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        flask_migrate.upgrade(directory=str(MIGRATIONS))
+        seed()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
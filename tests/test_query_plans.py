@@ -0,0 +1,27 @@
+from application.extensions import db
+from application.query_plans import check_query_plans, full_scans
+
+def test_hot_queries_use_indexes(app):
+    failing = [f'{name} scans {", ".join(scans)}:\n    ' + '\n    '.join(plan)
+               for name, plan, scans in check_query_plans() if scans]
+    assert not failing, '\n'.join(failing)
+
+def _execute_ddl(sql):
+    db.session.execute(db.text(sql))
+    db.session.commit()
+    # EXPLAIN never runs the statement, so SQLite does not notice a stale cached plan: reconnect
+    db.session.remove()
+    db.engine.dispose()
+
+def test_check_flags_a_dropped_index(app):
+    _execute_ddl('DROP INDEX ix_questions_quiz_id')
+    try:
+        failing = {name: scans for name, plan, scans in check_query_plans() if scans}
+    finally:
+        _execute_ddl('CREATE INDEX ix_questions_quiz_id ON questions (quiz_id)')
+    assert failing.get('questions of quiz') == ['questions']
+
+def test_full_scans_ignores_index_scans_and_subqueries():
+    plan = ['CO-ROUTINE anon_1', 'SCAN scores USING INDEX idx_score_time_id', 'SCAN anon_1',
+            'SCAN users', 'SCAN users_1 USING COVERING INDEX ix_users_username']
+    assert full_scans(plan) == ['users']